@@ -1,17 +1,33 @@
 """
 Backtesting engine for strategy validation
 """
+import os
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
-from datetime import datetime, time, timedelta
-from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from dataclasses import dataclass, fields
 from config.settings import settings
 from strategy.reference_levels import ReferenceLevels
-from strategy.indicators import calculate_rsi
 from utils.logger import get_logger
 from utils.helpers import round_to_nearest
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional - without it the day simulator runs as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
 logger = get_logger(__name__)
 
 @dataclass
@@ -28,13 +44,426 @@ class BacktestTrade:
     max_sl: float
     max_price: float
 
+TRADE_FIELDS = [field.name for field in fields(BacktestTrade)]
+TIME_FIELDS = ('entry_time', 'exit_time')
+
+def _format_minutes(minutes: list) -> List[str]:
+    """Minute-of-day ints as 'HH:MM:SS' strings"""
+    return pd.to_datetime(np.asarray(minutes, dtype=np.int64), unit='m').strftime('%H:%M:%S').tolist()
+
+# Side / exit reason codes used by the compiled simulator
+SIDE_CALL = 0
+SIDE_PUT = 1
+SIDES = ('CALL', 'PUT')
+
+EXIT_HARD = 0
+EXIT_SL = 1
+EXIT_RSI = 2
+EXIT_REASONS = ('HARD_EXIT', 'SL_HIT', 'RSI_EXIT')
+EXIT_ICONS = {'HARD_EXIT': '🕒', 'SL_HIT': '🛑', 'RSI_EXIT': '📉'}
+
+# How each OHLC field aggregates when resampling (keyed by column suffix)
+OHLC_AGG = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last'}
+OHLC_COLUMNS = [f'{name}_{field}' for name in ('nifty', 'call', 'put') for field in OHLC_AGG]
+
+# RSI settings (same 20-candle lookback as the live bot)
+RSI_PERIOD = 14
+RSI_LOOKBACK = 20
+
+# Kernel prices are integer ticks of half a paisa, so reference midpoints stay exact
+PRICE_SCALE = 200
+
+@njit(cache=True)
+def _simulate_bars(side_signal, option_breakout,
+                  call_h, call_l, call_c,
+                  put_h, put_l, put_c,
+                  hard_exit,
+                  RC, GC, BC, RP, GP, BP,
+                  trailing_inc, rsi_exit_drop,
+                  call_rsi, put_rsi):
+    """
+    Run the intraday state machine over one day's 5-min bars (10:00 onwards)
+    
+    Pure numeric so it can be compiled with Numba; logging and trade
+    records are built by the caller from the returned arrays. The
+    stateless entry conditions arrive precomputed per bar:
+    side_signal (SIDE_CALL / SIDE_PUT / -1) and option_breakout
+    (option candle green and above its reference high).
+    
+    Prices, levels and trailing_inc are integer ticks (see PRICE_SCALE)
+    so every threshold comparison is exact.
+    
+    Returns:
+        Tuple of trade arrays (entry_idx, exit_idx, side, entry_px, exit_px,
+        reason, max_sl, max_px) followed by breakout arrays (idx, side, px)
+    """
+    n = len(side_signal)
+    
+    entry_idx = np.empty(n, dtype=np.int64)
+    exit_idx = np.empty(n, dtype=np.int64)
+    side_code = np.empty(n, dtype=np.int64)
+    entry_px = np.empty(n, dtype=np.int64)
+    exit_px = np.empty(n, dtype=np.int64)
+    reason_code = np.empty(n, dtype=np.int64)
+    max_sl = np.empty(n, dtype=np.int64)
+    max_px = np.empty(n, dtype=np.int64)
+    n_trades = 0
+    
+    breakout_idx = np.empty(n, dtype=np.int64)
+    breakout_side = np.empty(n, dtype=np.int64)
+    breakout_px = np.empty(n, dtype=np.int64)
+    n_breakouts = 0
+    
+    # State variables
+    in_trade = False
+    side = -1
+    entry_price = 0
+    entry_i = -1
+    stop_loss = 0
+    breakout_detected = False
+    confirmation_pending = False
+    breakout_high = 0
+    is_at_breakeven = False
+    last_trailing_level = 0
+    rsi_peak = np.nan
+    max_price = 0
+    ref_high = 0
+    ref_low = 0
+    ref_mid = 0
+    mid_trigger = 0
+    high_trigger = 0
+    entry_trigger = 0
+    
+    for i in range(n):
+        # Hard exit at 3:15 PM
+        if hard_exit[i] and in_trade:
+            entry_idx[n_trades] = entry_i
+            exit_idx[n_trades] = i
+            side_code[n_trades] = side
+            entry_px[n_trades] = entry_price
+            exit_px[n_trades] = call_c[i] if side == SIDE_CALL else put_c[i]
+            reason_code[n_trades] = EXIT_HARD
+            max_sl[n_trades] = stop_loss
+            max_px[n_trades] = max_price
+            n_trades += 1
+            break
+        
+        # If not in trade, look for entry
+        if not in_trade:
+            # Decide side
+            side = side_signal[i]
+            if side == SIDE_CALL:
+                ref_high = RC
+                ref_low = GC
+                ref_mid = BC
+                option_high = call_h[i]
+                option_close = call_c[i]
+            elif side == SIDE_PUT:
+                ref_high = RP
+                ref_low = GP
+                ref_mid = BP
+                option_high = put_h[i]
+                option_close = put_c[i]
+            else:
+                continue
+            
+            # Check breakout
+            if not breakout_detected:
+                if option_breakout[i]:
+                    breakout_detected = True
+                    breakout_high = option_high
+                    confirmation_pending = True
+                    breakout_idx[n_breakouts] = i
+                    breakout_side[n_breakouts] = side
+                    breakout_px[n_breakouts] = option_close
+                    n_breakouts += 1
+                    continue
+            
+            # Check confirmation
+            if confirmation_pending:
+                if option_breakout[i] and option_close > breakout_high:
+                    
+                    # ENTRY!
+                    in_trade = True
+                    entry_price = option_close
+                    entry_i = i
+                    stop_loss = ref_low
+                    mid_trigger = entry_price + (ref_mid - ref_low)
+                    high_trigger = entry_price + (ref_high - ref_low)
+                    entry_trigger = entry_price + (entry_price - ref_low)
+                    last_trailing_level = entry_price
+                    max_price = entry_price
+                    rsi_peak = np.nan
+                else:
+                    # Reset if confirmation failed
+                    breakout_detected = False
+                    confirmation_pending = False
+                    breakout_high = 0
+        
+        # If in trade, manage position
+        else:
+            if side == SIDE_CALL:
+                option_close = call_c[i]
+                option_low = call_l[i]
+                current_rsi = call_rsi[i]
+            else:
+                option_close = put_c[i]
+                option_low = put_l[i]
+                current_rsi = put_rsi[i]
+            
+            # Track max price
+            if option_close > max_price:
+                max_price = option_close
+            
+            # Check stop loss hit
+            if option_low <= stop_loss:
+                entry_idx[n_trades] = entry_i
+                exit_idx[n_trades] = i
+                side_code[n_trades] = side
+                entry_px[n_trades] = entry_price
+                exit_px[n_trades] = stop_loss
+                reason_code[n_trades] = EXIT_SL
+                max_sl[n_trades] = stop_loss
+                max_px[n_trades] = max_price
+                n_trades += 1
+                
+                # Reset for next trade
+                in_trade = False
+                side = -1
+                breakout_detected = False
+                confirmation_pending = False
+                continue
+            
+            # Progressive SL (before breakeven): first applicable step only, one step per bar
+            if not is_at_breakeven:
+                to_mid = (option_close >= mid_trigger) & (stop_loss < ref_mid)
+                to_high = (not to_mid) & (option_close >= high_trigger) & (stop_loss < ref_high)
+                to_entry = (not (to_mid | to_high)) & (option_close >= entry_trigger) & (stop_loss < entry_price)
+                stop_loss = max(stop_loss, to_mid * ref_mid, to_high * ref_high, to_entry * entry_price)
+                is_at_breakeven = stop_loss >= entry_price
+            
+            # Trailing SL (after breakeven)
+            if is_at_breakeven:
+                price_above_entry = option_close - entry_price
+                num_increments = price_above_entry // trailing_inc
+                
+                if num_increments > 0:
+                    new_trailing = entry_price + (num_increments * trailing_inc)
+                    if new_trailing > last_trailing_level:
+                        stop_loss = new_trailing
+                        last_trailing_level = new_trailing
+            
+            # RSI exit check (RSI precomputed per bar over the trailing candles)
+            if not np.isnan(current_rsi):
+                if np.isnan(rsi_peak) or current_rsi > rsi_peak:
+                    rsi_peak = current_rsi
+                
+                if rsi_peak != 0.0 and (rsi_peak - current_rsi) >= rsi_exit_drop:
+                    entry_idx[n_trades] = entry_i
+                    exit_idx[n_trades] = i
+                    side_code[n_trades] = side
+                    entry_px[n_trades] = entry_price
+                    exit_px[n_trades] = option_close
+                    reason_code[n_trades] = EXIT_RSI
+                    max_sl[n_trades] = stop_loss
+                    max_px[n_trades] = max_price
+                    n_trades += 1
+                    
+                    # Reset
+                    in_trade = False
+                    side = -1
+                    breakout_detected = False
+                    confirmation_pending = False
+                    continue
+    
+    return (entry_idx[:n_trades], exit_idx[:n_trades], side_code[:n_trades],
+            entry_px[:n_trades], exit_px[:n_trades], reason_code[:n_trades],
+            max_sl[:n_trades], max_px[:n_trades],
+            breakout_idx[:n_breakouts], breakout_side[:n_breakouts], breakout_px[:n_breakouts])
+
+def _price_array(prices: pd.Series) -> np.ndarray:
+    """float64 prices snapped back to the 2-decimal grid (undoes float32 storage noise)"""
+    return np.round(prices.to_numpy(dtype=np.float64), 2)
+
+def _to_ticks(prices):
+    """Prices (array or scalar) as int32 ticks of 1/PRICE_SCALE"""
+    return np.rint(np.asarray(prices, dtype=np.float64) * PRICE_SCALE).astype(np.int32)
+
+@njit(cache=True)
+def _rolling_rsi(close: np.ndarray) -> np.ndarray:
+    """
+    RSI at every bar over the trailing RSI_LOOKBACK candles (NaN until enough history)
+    
+    Runs Wilder's recurrence over each trailing window with the same
+    arithmetic as pandas ewm(adjust=False), so the values match
+    calculate_rsi() on that window exactly.
+    """
+    n = len(close)
+    alpha = 1.0 / RSI_PERIOD
+    rsi = np.full(n, np.nan)
+    
+    # Need RSI_PERIOD + 1 candles before the value is used
+    for i in range(RSI_PERIOD, n):
+        avg_gain = np.nan
+        avg_loss = np.nan
+        
+        for k in range(max(1, i - RSI_LOOKBACK + 2), i + 1):
+            delta = close[k] - close[k - 1]
+            if np.isnan(delta):
+                continue
+            gain = max(delta, 0.0)
+            loss = -min(delta, 0.0)
+            
+            if np.isnan(avg_gain):
+                avg_gain = gain
+                avg_loss = loss
+                continue
+            if avg_gain != gain:
+                avg_gain = ((1 - alpha) * avg_gain + alpha * gain) / ((1 - alpha) + alpha)
+            if avg_loss != loss:
+                avg_loss = ((1 - alpha) * avg_loss + alpha * loss) / ((1 - alpha) + alpha)
+        
+        # x / 0 follows NumPy (inf, or NaN for 0 / 0) in both compiled and plain Python
+        if avg_loss == 0.0:
+            rsi[i] = 100.0 if avg_gain > 0.0 else np.nan
+        else:
+            rsi[i] = 100 - (100 / (1 + avg_gain / avg_loss))
+    
+    return rsi
+
+def simulate_day(df: pd.DataFrame, levels: ReferenceLevels, date: str) -> Tuple[Dict[str, list], List[str]]:
+    """
+    Simulate the strategy on one day of 5-min candles
+    
+    Pure function of its inputs so days can be run in worker processes.
+    
+    Args:
+        df: The day's 5-min candles
+        levels: Reference levels for the day
+        date: Date string used in the trade records
+    
+    Returns:
+        Tuple of (trade columns keyed by TRADE_FIELDS, log messages in bar order)
+    """
+    # Strategy parameters, read once per day
+    lot_size = settings.LOT_SIZE
+    trailing_inc = float(settings.TRAILING_INCREMENT)
+    rsi_exit_drop = float(settings.RSI_EXIT_DROP)
+    
+    # Session checks run on minute-of-day integers
+    minutes = np.asarray(df.index.hour * 60 + df.index.minute)
+    
+    # Filter trading hours (10:00 onwards)
+    in_session = minutes >= 10 * 60
+    trading_data = df[in_session]
+    session_minutes = minutes[in_session]
+    hard_exit = session_minutes >= 15 * 60 + 15
+    
+    # RSI is taken on the full day so early bars have history; keep only the trading window
+    offset = len(df) - len(trading_data)
+    call_rsi = _rolling_rsi(_price_array(df['call_close']))[offset:]
+    put_rsi = _rolling_rsi(_price_array(df['put_close']))[offset:]
+    
+    # Prices and levels as integer ticks from here on
+    nifty_open, nifty_close = (_to_ticks(_price_array(trading_data[f'nifty_{f}']))
+                               for f in ('open', 'close'))
+    call_o, call_h, call_l, call_c = (_to_ticks(_price_array(trading_data[f'call_{f}']))
+                                      for f in ('open', 'high', 'low', 'close'))
+    put_o, put_h, put_l, put_c = (_to_ticks(_price_array(trading_data[f'put_{f}']))
+                                  for f in ('open', 'high', 'low', 'close'))
+    RN, GN, RC, GC, BC, RP, GP, BP = (
+        int(_to_ticks(level)) for level in
+        (levels.RN, levels.GN, levels.RC, levels.GC, levels.BC, levels.RP, levels.GP, levels.BP)
+    )
+    
+    # Stateless entry conditions for every bar at once; the kernel only tracks state
+    call_bar = (nifty_close > nifty_open) & (nifty_close > RN)
+    put_bar = (nifty_close < nifty_open) & (nifty_close < GN)
+    side_signal = np.select([call_bar, put_bar], [SIDE_CALL, SIDE_PUT], default=-1)
+    option_breakout = np.where(
+        call_bar,
+        (call_c > call_o) & (call_c > RC),
+        (put_c > put_o) & (put_c > RP)
+    )
+    
+    (entry_idx, exit_idx, side_codes, entry_ticks, exit_ticks,
+     reason_codes, max_sl_ticks, max_ticks,
+     breakout_idx, breakout_sides, breakout_ticks) = _simulate_bars(
+        side_signal, option_breakout,
+        call_h, call_l, call_c,
+        put_h, put_l, put_c,
+        hard_exit,
+        RC, GC, BC,
+        RP, GP, BP,
+        int(_to_ticks(trailing_inc)),
+        rsi_exit_drop,
+        call_rsi,
+        put_rsi
+    )
+    
+    # Back to rupees only for the finished trades
+    entry_prices, exit_prices, max_sls, max_prices, breakout_prices = (
+        ticks / PRICE_SCALE for ticks in
+        (entry_ticks, exit_ticks, max_sl_ticks, max_ticks, breakout_ticks)
+    )
+    
+    # Trade records as columns straight from the kernel output (times stay minute-of-day ints)
+    sides = [SIDES[code] for code in side_codes]
+    exit_reasons = [EXIT_REASONS[code] for code in reason_codes]
+    pnls = (exit_ticks - entry_ticks) * lot_size / PRICE_SCALE
+    
+    trade_cols = {
+        'date': [date] * len(entry_idx),
+        'side': sides,
+        'entry_time': session_minutes[entry_idx].tolist(),
+        'entry_price': entry_prices.tolist(),
+        'exit_time': session_minutes[exit_idx].tolist(),
+        'exit_price': exit_prices.tolist(),
+        'exit_reason': exit_reasons,
+        'pnl': pnls.tolist(),
+        'max_sl': max_sls.tolist(),
+        'max_price': max_prices.tolist(),
+    }
+    
+    # Rebuild the log messages in bar order now that the simulation is done
+    events = []
+    for k in range(len(breakout_idx)):
+        side = SIDES[breakout_sides[k]]
+        events.append((breakout_idx[k], f"  🔔 Breakout detected: {side} @ {breakout_prices[k]:.2f}"))
+    
+    for k in range(len(entry_idx)):
+        side = sides[k]
+        exit_reason = exit_reasons[k]
+        initial_sl = levels.GC if side_codes[k] == SIDE_CALL else levels.GP
+        
+        events.append((entry_idx[k], f"  ✅ ENTRY: {side} @ {entry_prices[k]:.2f} | SL: {initial_sl:.2f}"))
+        events.append((exit_idx[k], f"  {EXIT_ICONS[exit_reason]} {exit_reason.replace('_', ' ')}: "
+                                    f"{side} @ {exit_prices[k]:.2f} | P&L: ₹{pnls[k]:,.2f}"))
+    
+    messages = [message for _, message in sorted(events, key=lambda event: event[0])]
+    return trade_cols, messages
+
 class Backtester:
     """Backtest the trading strategy on historical data"""
     
     def __init__(self):
-        self.trades: List[BacktestTrade] = []
+        # Trades are kept column-wise ({field: [values]}) and turned into a DataFrame in one go;
+        # entry/exit times are minute-of-day ints until a report or record needs the text
+        self._trade_cols: Dict[str, list] = {name: [] for name in TRADE_FIELDS}
         self.daily_pnl: Dict[str, float] = {}
     
+    @property
+    def trades(self) -> List[BacktestTrade]:
+        """Trades executed so far as BacktestTrade records"""
+        cols = {name: _format_minutes(values) if name in TIME_FIELDS else values
+                for name, values in self._trade_cols.items()}
+        return [BacktestTrade(*values) for values in zip(*cols.values())]
+    
+    def _add_trades(self, trade_cols: Dict[str, list]):
+        """Append one day's trade columns"""
+        for name, values in trade_cols.items():
+            self._trade_cols[name].extend(values)
+    
     def load_data(self, csv_path: str) -> pd.DataFrame:
         """
         Load historical data from CSV
@@ -50,10 +479,18 @@ class Backtester:
             DataFrame with datetime index
         """
         try:
-            df = pd.read_csv(csv_path)
-            df['datetime'] = pd.to_datetime(df['datetime'])
+            df = pd.read_csv(
+                csv_path,
+                engine=CSV_ENGINE,
+                dtype={col: np.float32 for col in OHLC_COLUMNS},
+                parse_dates=['datetime']
+            )
             df.set_index('datetime', inplace=True)
             
+            # Arrow hands back offset timestamps in UTC; put them back in exchange time
+            if df.index.tz is not None:
+                df.index = df.index.tz_convert(settings.TIMEZONE)
+            
             logger.info(f"Loaded {len(df)} candles from {csv_path}")
             return df
             
@@ -64,44 +501,69 @@ class Backtester:
     def resample_to_5min(self, df: pd.DataFrame) -> pd.DataFrame:
         """Resample 1-min data to 5-min candles"""
         resampled = df.resample('5min').agg({
-            'nifty_open': 'first',
-            'nifty_high': 'max',
-            'nifty_low': 'min',
-            'nifty_close': 'last',
-            'call_open': 'first',
-            'call_high': 'max',
-            'call_low': 'min',
-            'call_close': 'last',
-            'put_open': 'first',
-            'put_high': 'max',
-            'put_low': 'min',
-            'put_close': 'last',
+            col: OHLC_AGG[col.rsplit('_', 1)[-1]] for col in OHLC_COLUMNS
         }).dropna()
         
         return resampled
     
+    def load_5min_data(self, csv_path: str) -> pd.DataFrame:
+        """
+        Load 5-min candles, reusing a Parquet cache next to the CSV
+        
+        The cache is rebuilt whenever the CSV is newer than it.
+        
+        Args:
+            csv_path: Path to historical data CSV
+        
+        Returns:
+            5-min DataFrame with datetime index
+        """
+        cache_path = f"{csv_path}.5min.parquet"
+        
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) > os.path.getmtime(csv_path):
+            try:
+                df_5min = pd.read_parquet(cache_path)
+                logger.info(f"Loaded {len(df_5min)} 5-min candles from cache {cache_path}")
+                return df_5min
+            except Exception as e:
+                logger.warning(f"Could not read cache {cache_path}, rebuilding: {e}")
+        
+        df_5min = self.resample_to_5min(self.load_data(csv_path))
+        
+        try:
+            df_5min.to_parquet(cache_path)
+        except Exception as e:
+            logger.warning(f"Could not write cache {cache_path}: {e}")
+        
+        return df_5min
+    
     def calculate_reference_levels(self, df: pd.DataFrame, date: str) -> Optional[ReferenceLevels]:
         """Calculate reference levels from 09:45-10:00 candle"""
         try:
-            ref_start = pd.Timestamp(f"{date} 09:45:00")
-            ref_end = pd.Timestamp(f"{date} 09:59:59")
+            # Day's bars are sorted, so the window is a contiguous run of minutes
+            minutes = df.index.hour * 60 + df.index.minute
+            ref_start, ref_end = np.searchsorted(minutes, [9 * 60 + 45, 10 * 60])
             
-            ref_data = df.loc[ref_start:ref_end]
+            ref_data = df.iloc[ref_start:ref_end]
             
             if len(ref_data) == 0:
                 logger.warning(f"No data in reference window for {date}")
                 return None
             
+            # One reduction per column
+            stats = ref_data.agg({
+                'nifty_high': 'max', 'nifty_low': 'min',
+                'call_high': 'max', 'call_low': 'min',
+                'put_high': 'max', 'put_low': 'min',
+            }).astype(np.float64).round(2)
+            RN, GN = stats['nifty_high'], stats['nifty_low']
+            RC, GC = stats['call_high'], stats['call_low']
+            RP, GP = stats['put_high'], stats['put_low']
+            
             levels = ReferenceLevels(
-                RN=ref_data['nifty_high'].max(),
-                GN=ref_data['nifty_low'].min(),
-                BN=(ref_data['nifty_high'].max() + ref_data['nifty_low'].min()) / 2,
-                RC=ref_data['call_high'].max(),
-                GC=ref_data['call_low'].min(),
-                BC=(ref_data['call_high'].max() + ref_data['call_low'].min()) / 2,
-                RP=ref_data['put_high'].max(),
-                GP=ref_data['put_low'].min(),
-                BP=(ref_data['put_high'].max() + ref_data['put_low'].min()) / 2
+                RN=RN, GN=GN, BN=(RN + GN) / 2,
+                RC=RC, GC=GC, BC=(RC + GC) / 2,
+                RP=RP, GP=GP, BP=(RP + GP) / 2
             )
             
             return levels
@@ -110,7 +572,7 @@ class Backtester:
             logger.error(f"Error calculating reference levels: {e}")
             return None
     
-    def run_backtest(self, data_path: str, start_date: str = None, end_date: str = None):
+    def run_backtest(self, data_path: str, start_date: str = None, end_date: str = None, n_jobs: int = None):
         """
         Run backtest on historical data
         
@@ -118,34 +580,28 @@ class Backtester:
             data_path: Path to CSV file with historical data
             start_date: Start date (YYYY-MM-DD)
             end_date: End date (YYYY-MM-DD)
+            n_jobs: Worker processes for simulating days (default: all CPUs, 1 = in-process)
         """
         logger.info("🔄 Starting backtest...")
         
-        # Load data
-        df_1min = self.load_data(data_path)
+        # Load 5-min data (from the Parquet cache when it is fresh)
+        df_5min = self.load_5min_data(data_path)
         
         # Filter date range
         if start_date:
-            df_1min = df_1min[df_1min.index >= start_date]
+            df_5min = df_5min[df_5min.index >= start_date]
         if end_date:
-            df_1min = df_1min[df_1min.index <= end_date]
-        
-        # Resample to 5-min
-        df_5min = self.resample_to_5min(df_1min)
+            df_5min = df_5min[df_5min.index <= end_date]
         
-        # Get unique dates
-        dates = df_5min.index.date
-        unique_dates = sorted(set(dates))
+        # Split into per-day frames in a single pass
+        days = df_5min.groupby(df_5min.index.normalize(), sort=True)
         
-        logger.info(f"Backtesting {len(unique_dates)} days...")
+        logger.info(f"Backtesting {days.ngroups} days...")
         
-        for date in unique_dates:
-            logger.info(f"\n{'='*60}")
-            logger.info(f"Backtesting date: {date}")
-            logger.info(f"{'='*60}")
-            
-            # Get data for this date
-            day_data = df_5min[df_5min.index.date == date]
+        # Collect the days to simulate (each day is independent)
+        day_jobs = []
+        for day, day_data in days:
+            date = day.date()
             
             if len(day_data) < 10:
                 logger.warning(f"Insufficient data for {date}, skipping")
@@ -156,228 +612,62 @@ class Backtester:
             if not levels:
                 continue
             
-            # Run strategy for this day
-            self._backtest_single_day(day_data, levels, str(date))
+            day_jobs.append((day_data, levels, str(date)))
+        
+        # Run strategy for each day, in parallel when worthwhile
+        n_jobs = n_jobs or os.cpu_count() or 1
+        if n_jobs > 1 and len(day_jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(day_jobs))) as executor:
+                results = list(executor.map(simulate_day, *zip(*day_jobs)))
+        else:
+            results = [simulate_day(*job) for job in day_jobs]
+        
+        # Results come back in date order, so the log reads the same as a sequential run
+        for (_, _, date), (trade_cols, messages) in zip(day_jobs, results):
+            logger.info(f"\n{'='*60}")
+            logger.info(f"Backtesting date: {date}")
+            logger.info(f"{'='*60}")
+            
+            self._add_trades(trade_cols)
+            for message in messages:
+                logger.info(message)
         
         # Generate report
         self._generate_report()
     
     def _backtest_single_day(self, df: pd.DataFrame, levels: ReferenceLevels, date: str):
         """Backtest a single day"""
-        
-        # State variables
-        in_trade = False
-        side = None
-        entry_price = None
-        entry_time = None
-        stop_loss = None
-        breakout_detected = False
-        confirmation_pending = False
-        breakout_high = None
-        is_at_breakeven = False
-        last_trailing_level = None
-        rsi_peak = None
-        max_price = None
-        
-        # Filter trading hours (10:00 onwards)
-        trading_data = df[df.index.time >= time(10, 0)]
-        
-        for idx, row in trading_data.iterrows():
-            current_time = idx.time()
-            
-            # Hard exit at 3:15 PM
-            if current_time >= time(15, 15) and in_trade:
-                exit_price = row[f'{side.lower()}_close']
-                pnl = (exit_price - entry_price) * settings.LOT_SIZE
-                
-                trade = BacktestTrade(
-                    date=date,
-                    side=side,
-                    entry_time=str(entry_time.time()),
-                    entry_price=entry_price,
-                    exit_time=str(current_time),
-                    exit_price=exit_price,
-                    exit_reason='HARD_EXIT',
-                    pnl=pnl,
-                    max_sl=stop_loss,
-                    max_price=max_price
-                )
-                self.trades.append(trade)
-                logger.info(f"  🕒 HARD EXIT: {side} @ {exit_price:.2f} | P&L: ₹{pnl:,.2f}")
-                break
-            
-            # If not in trade, look for entry
-            if not in_trade:
-                # Decide side
-                nifty_close = row['nifty_close']
-                nifty_open = row['nifty_open']
-                
-                if nifty_close > nifty_open and nifty_close > levels.RN:
-                    side = 'CALL'
-                    ref_high = levels.RC
-                    ref_low = levels.GC
-                    ref_mid = levels.BC
-                elif nifty_close < nifty_open and nifty_close < levels.GN:
-                    side = 'PUT'
-                    ref_high = levels.RP
-                    ref_low = levels.GP
-                    ref_mid = levels.BP
-                else:
-                    continue
-                
-                option_close = row[f'{side.lower()}_close']
-                option_open = row[f'{side.lower()}_open']
-                option_high = row[f'{side.lower()}_high']
-                
-                # Check breakout
-                if not breakout_detected:
-                    if option_close > option_open and option_close > ref_high:
-                        breakout_detected = True
-                        breakout_high = option_high
-                        confirmation_pending = True
-                        logger.info(f"  🔔 Breakout detected: {side} @ {option_close:.2f}")
-                        continue
-                
-                # Check confirmation
-                if confirmation_pending:
-                    if (option_close > option_open and 
-                        option_close > breakout_high and 
-                        option_close > ref_high):
-                        
-                        # ENTRY!
-                        in_trade = True
-                        entry_price = option_close
-                        entry_time = idx
-                        stop_loss = ref_low
-                        last_trailing_level = entry_price
-                        max_price = entry_price
-                        rsi_peak = None
-                        
-                        logger.info(f"  ✅ ENTRY: {side} @ {entry_price:.2f} | SL: {stop_loss:.2f}")
-                    else:
-                        # Reset if confirmation failed
-                        breakout_detected = False
-                        confirmation_pending = False
-                        breakout_high = None
-            
-            # If in trade, manage position
-            else:
-                option_close = row[f'{side.lower()}_close']
-                option_low = row[f'{side.lower()}_low']
-                
-                # Track max price
-                if option_close > max_price:
-                    max_price = option_close
-                
-                # Check stop loss hit
-                if option_low <= stop_loss:
-                    exit_price = stop_loss
-                    pnl = (exit_price - entry_price) * settings.LOT_SIZE
-                    
-                    trade = BacktestTrade(
-                        date=date,
-                        side=side,
-                        entry_time=str(entry_time.time()),
-                        entry_price=entry_price,
-                        exit_time=str(current_time),
-                        exit_price=exit_price,
-                        exit_reason='SL_HIT',
-                        pnl=pnl,
-                        max_sl=stop_loss,
-                        max_price=max_price
-                    )
-                    self.trades.append(trade)
-                    logger.info(f"  🛑 SL HIT: {side} @ {exit_price:.2f} | P&L: ₹{pnl:,.2f}")
-                    
-                    # Reset for next trade
-                    in_trade = False
-                    side = None
-                    breakout_detected = False
-                    confirmation_pending = False
-                    continue
-                
-                # Progressive SL (before breakeven)
-                if not is_at_breakeven:
-                    EC = entry_price
-                    GC = ref_low
-                    BC = ref_mid
-                    RC = ref_high
-                    
-                    if option_close >= EC + (BC - GC) and stop_loss < BC:
-                        stop_loss = BC
-                    elif option_close >= EC + (RC - GC) and stop_loss < RC:
-                        stop_loss = RC
-                    elif option_close >= EC + (EC - GC) and stop_loss < EC:
-                        stop_loss = EC
-                        is_at_breakeven = True
-                
-                # Trailing SL (after breakeven)
-                if is_at_breakeven:
-                    price_above_entry = option_close - entry_price
-                    num_increments = int(price_above_entry / settings.TRAILING_INCREMENT)
-                    
-                    if num_increments > 0:
-                        new_trailing = entry_price + (num_increments * settings.TRAILING_INCREMENT)
-                        if new_trailing > last_trailing_level:
-                            stop_loss = new_trailing
-                            last_trailing_level = new_trailing
-                
-                # RSI exit check (calculate RSI on last 14 candles)
-                # Get historical data for RSI
-                hist_data = df[df.index <= idx].tail(20)
-                if len(hist_data) >= 15:
-                    rsi_series = calculate_rsi(hist_data[f'{side.lower()}_close'], period=14)
-                    current_rsi = rsi_series.iloc[-1]
-                    
-                    if not np.isnan(current_rsi):
-                        if rsi_peak is None or current_rsi > rsi_peak:
-                            rsi_peak = current_rsi
-                        
-                        if rsi_peak and (rsi_peak - current_rsi) >= settings.RSI_EXIT_DROP:
-                            exit_price = option_close
-                            pnl = (exit_price - entry_price) * settings.LOT_SIZE
-                            
-                            trade = BacktestTrade(
-                                date=date,
-                                side=side,
-                                entry_time=str(entry_time.time()),
-                                entry_price=entry_price,
-                                exit_time=str(current_time),
-                                exit_price=exit_price,
-                                exit_reason='RSI_EXIT',
-                                pnl=pnl,
-                                max_sl=stop_loss,
-                                max_price=max_price
-                            )
-                            self.trades.append(trade)
-                            logger.info(f"  📉 RSI EXIT: {side} @ {exit_price:.2f} | P&L: ₹{pnl:,.2f}")
-                            
-                            # Reset
-                            in_trade = False
-                            side = None
-                            breakout_detected = False
-                            confirmation_pending = False
-                            continue
+        trade_cols, messages = simulate_day(df, levels, date)
+        self._add_trades(trade_cols)
+        for message in messages:
+            logger.info(message)
     
     def _generate_report(self):
         """Generate backtest report"""
-        if not self.trades:
+        if not self._trade_cols['pnl']:
             logger.warning("No trades executed in backtest")
             return
         
-        df_trades = pd.DataFrame([asdict(t) for t in self.trades])
+        df_trades = pd.DataFrame(self._trade_cols)
+        for name in TIME_FIELDS:
+            df_trades[name] = _format_minutes(df_trades[name])
+        
+        # Calculate metrics (one win mask over the raw P&L array)
+        pnl = df_trades['pnl'].to_numpy()
+        is_win = pnl > 0
+        wins = pnl[is_win]
+        losses = pnl[~is_win]
         
-        # Calculate metrics
-        total_trades = len(df_trades)
-        winning_trades = len(df_trades[df_trades['pnl'] > 0])
-        losing_trades = len(df_trades[df_trades['pnl'] <= 0])
+        total_trades = pnl.size
+        winning_trades = wins.size
+        losing_trades = losses.size
         win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
         
-        total_pnl = df_trades['pnl'].sum()
-        avg_win = df_trades[df_trades['pnl'] > 0]['pnl'].mean() if winning_trades > 0 else 0
-        avg_loss = df_trades[df_trades['pnl'] <= 0]['pnl'].mean() if losing_trades > 0 else 0
-        max_win = df_trades['pnl'].max()
-        max_loss = df_trades['pnl'].min()
+        total_pnl = pnl.sum()
+        avg_win = wins.mean() if winning_trades > 0 else 0
+        avg_loss = losses.mean() if losing_trades > 0 else 0
+        max_win = pnl.max()
+        max_loss = pnl.min()
         
         # Print report
         print("\n" + "="*80)
@@ -2,13 +2,20 @@
 Configuration settings with KiteConnect phase support
 """
 import os
+from dataclasses import dataclass
 from dotenv import load_dotenv
 import pytz
 
 load_dotenv()
 
+@dataclass(frozen=True, slots=True)
 class Settings:
-    """Application settings from environment variables"""
+    """
+    Application settings from environment variables
+    
+    Read once at import into a frozen, slotted instance so hot loops pay
+    a slot lookup rather than a class-dict lookup per access.
+    """
     
     # Phase Configuration
     TRADING_PHASE: int = int(os.getenv('TRADING_PHASE', '1'))
@@ -17,15 +24,13 @@ class Settings:
     # Phase 2: Real KiteConnect data + Paper trading  
     # Phase 3: Real KiteConnect data + Real orders
     
-    @classmethod
-    def is_using_real_data(cls) -> bool:
+    def is_using_real_data(self) -> bool:
         """Check if using real broker data (Phase 2 or 3)"""
-        return cls.TRADING_PHASE >= 2
+        return self.TRADING_PHASE >= 2
     
-    @classmethod
-    def is_live_trading(cls) -> bool:
+    def is_live_trading(self) -> bool:
         """Check if placing real orders (Phase 3)"""
-        return cls.TRADING_PHASE == 3
+        return self.TRADING_PHASE == 3
     
     # KiteConnect Configuration
     KITE_API_KEY: str = os.getenv('KITE_API_KEY', '')
@@ -59,26 +64,27 @@ class Settings:
     INSTRUMENTS_CSV_PATH: str = os.getenv('INSTRUMENTS_CSV_PATH', './data/instruments.csv')
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE_PATH: str = os.getenv('LOG_FILE_PATH', './logs/trading.log')
+    # Paper trade rows are written out in batches of this size (0 = only at summary/exit)
+    PAPER_TRADE_FLUSH_EVERY: int = int(os.getenv('PAPER_TRADE_FLUSH_EVERY', '10'))
     TIMEZONE: pytz.timezone = pytz.timezone(os.getenv('TIMEZONE', 'Asia/Kolkata'))
     
-    @classmethod
-    def validate(cls) -> bool:
+    def validate(self) -> bool:
         """Validate configuration"""
         errors = []
         
         # Phase 2 & 3 require KiteConnect credentials
-        if cls.is_using_real_data():
-            if not cls.KITE_API_KEY:
+        if self.is_using_real_data():
+            if not self.KITE_API_KEY:
                 errors.append("KITE_API_KEY required for Phase 2/3")
-            if not cls.KITE_ACCESS_TOKEN:
+            if not self.KITE_ACCESS_TOKEN:
                 errors.append("KITE_ACCESS_TOKEN required for Phase 2/3")
         
         # Phase 3 requires AlgoTest
-        if cls.is_live_trading():
-            if not cls.ALGOTEST_API_KEY:
+        if self.is_live_trading():
+            if not self.ALGOTEST_API_KEY:
                 errors.append("ALGOTEST_API_KEY required for Phase 3")
         
-        if cls.STRIKE_OFFSET <= 0:
+        if self.STRIKE_OFFSET <= 0:
             errors.append("STRIKE_OFFSET must be positive")
         
         if errors:
@@ -88,8 +94,7 @@ class Settings:
         
         return True
     
-    @classmethod
-    def print_config(cls):
+    def print_config(self):
         """Print current configuration"""
         phase_names = {
             1: "📝 PHASE 1: Mock Data + Paper Trading",
@@ -100,14 +105,14 @@ class Settings:
         print("\n" + "="*60)
         print("📊 NIFTY OPTIONS TRADING BOT - CONFIGURATION")
         print("="*60)
-        print(f"Mode: {phase_names.get(cls.TRADING_PHASE, 'Unknown')}")
-        print(f"Using Real Data: {'✅ Yes' if cls.is_using_real_data() else '❌ No (Mock)'}")
-        print(f"Live Orders: {'🔴 YES' if cls.is_live_trading() else '📝 No (Paper)'}")
-        print(f"Strike Offset: ±{cls.STRIKE_OFFSET}")
-        print(f"Lot Size: {cls.LOT_SIZE}")
-        print(f"Daily Loss Limit: ₹{cls.DAILY_LOSS_LIMIT:,.2f}")
-        print(f"Trailing Increment: {cls.TRAILING_INCREMENT}")
-        print(f"RSI Exit Drop: {cls.RSI_EXIT_DROP}")
+        print(f"Mode: {phase_names.get(self.TRADING_PHASE, 'Unknown')}")
+        print(f"Using Real Data: {'✅ Yes' if self.is_using_real_data() else '❌ No (Mock)'}")
+        print(f"Live Orders: {'🔴 YES' if self.is_live_trading() else '📝 No (Paper)'}")
+        print(f"Strike Offset: ±{self.STRIKE_OFFSET}")
+        print(f"Lot Size: {self.LOT_SIZE}")
+        print(f"Daily Loss Limit: ₹{self.DAILY_LOSS_LIMIT:,.2f}")
+        print(f"Trailing Increment: {self.TRAILING_INCREMENT}")
+        print(f"RSI Exit Drop: {self.RSI_EXIT_DROP}")
         print("="*60 + "\n")
 
 # Global settings instance
@@ -4,27 +4,387 @@ Phase 1: Mock data
 Phase 2 & 3: Real KiteConnect data
 """
 import pandas as pd
-from typing import List, Dict, Optional, Callable
+import numpy as np
+from typing import List, Dict, Optional, Callable, Tuple, Set
 from datetime import datetime, timedelta
 import time
+import socket
+import struct
+import threading
+from queue import SimpleQueue, Empty
 from config.settings import settings
 from utils.logger import setup_logger
 from utils.helpers import get_current_time
 
+try:
+    import orjson
+except ImportError:
+    # orjson is optional - without it kiteconnect parses responses with the stdlib json
+    orjson = None
+
 logger = setup_logger('BrokerAPI', level='INFO')
 
+# REST LTP/quote results are reused for this long (seconds) so bursts of polls share one call
+REST_CACHE_TTL = 0.05
+
+# Keep-alive connection pool for KiteConnect REST calls (HTTPAdapter kwargs)
+REST_POOL = {'pool_connections': 4, 'pool_maxsize': 16, 'max_retries': 0}
+
+# Kernel receive buffer for the ticker socket, sized for tick bursts
+WS_RCVBUF_BYTES = 1 << 20
+
+# Cached ticks older than this (seconds) are dropped by clear_stale_ticks()
+STALE_TICK_SECONDS = 15 * 60
+
+# Kite binary tick layouts (big-endian uint32 fields), keyed by packet length
+_FRAME_HEADER = struct.Struct('>H')
+_TICK_LAYOUTS = {
+    8: struct.Struct('>2I'),     # LTP: token, ltp
+    28: struct.Struct('>6I'),    # index quote: token, ltp, high, low, open, close
+    32: struct.Struct('>6I4xI'), # index full: ... + exchange timestamp
+    44: struct.Struct('>11I'),   # quote: token, ltp, ltq, atp, volume, buy qty, sell qty, open, high, low, close
+    184: struct.Struct('>16I'),  # full: ... + last trade time, oi, oi high, oi low, exchange timestamp (depth follows)
+}
+
+def _from_epoch(seconds: int) -> Optional[datetime]:
+    try:
+        return datetime.fromtimestamp(seconds)
+    except Exception:
+        return None
+
+def _orjson_response_hook(response, *args, **kwargs):
+    """Make response.json() (used by kiteconnect for every REST call) parse with orjson"""
+    if 'json' in response.headers.get('content-type', ''):
+        response.json = lambda **_: orjson.loads(response.content)
+    return response
+
+def _tuned_kite_ticker():
+    """KiteTicker subclass with Nagle disabled and a larger socket receive buffer"""
+    from kiteconnect import KiteTicker
+    from kiteconnect.ticker import KiteTickerClientProtocol
+    
+    class TunedTickerProtocol(KiteTickerClientProtocol):
+        def connectionMade(self):
+            super().connectionMade()
+            try:
+                sock = self.transport.getHandle()
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, WS_RCVBUF_BYTES)
+                # autobahn's own tcpNoDelay call swallows errors, so set it on the socket too
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            except Exception as e:
+                logger.warning(f"Could not tune WebSocket socket options: {e}")
+    
+    class TunedKiteTicker(KiteTicker):
+        def _create_connection(self, url, **kwargs):
+            super()._create_connection(url, **kwargs)
+            self.factory.protocol = TunedTickerProtocol
+            self.factory.setProtocolOptions(tcpNoDelay=True)
+        
+        def _parse_binary(self, bin):
+            """
+            Same ticks as KiteTicker._parse_binary, minus market depth
+            
+            Each packet is decoded with one precompiled unpack_from on the frame
+            instead of a slice + struct.unpack per field. Depth (20 entries on
+            full-mode quotes) is skipped since nothing in the bot reads it.
+            """
+            if len(bin) < 2:
+                return []
+            
+            exchange_map = self.EXCHANGE_MAP
+            cds, bcd, nco, indices = (exchange_map[k] for k in ('cds', 'bcd', 'nco', 'indices'))
+            ticks = []
+            offset = 2
+            for _ in range(_FRAME_HEADER.unpack_from(bin, 0)[0]):
+                length = _FRAME_HEADER.unpack_from(bin, offset)[0]
+                start = offset + 2
+                offset = start + length
+                layout = _TICK_LAYOUTS.get(length)
+                if layout is None:
+                    continue
+                fields = layout.unpack_from(bin, start)
+                
+                token = fields[0]
+                segment = token & 0xff
+                if segment == cds:
+                    divisor = 10000000.0
+                elif segment == bcd or segment == nco:
+                    divisor = 10000.0
+                else:
+                    divisor = 100.0
+                ltp = fields[1] / divisor
+                tick = {
+                    'tradable': segment != indices,
+                    'mode': self.MODE_LTP,
+                    'instrument_token': token,
+                    'last_price': ltp
+                }
+                
+                if length <= 32:
+                    if length > 8:
+                        high, low, open_, close = (v / divisor for v in fields[2:6])
+                        tick['mode'] = self.MODE_QUOTE if length == 28 else self.MODE_FULL
+                else:
+                    open_, high, low, close = (v / divisor for v in fields[7:11])
+                    tick['mode'] = self.MODE_QUOTE if length == 44 else self.MODE_FULL
+                    tick['last_traded_quantity'] = fields[2]
+                    tick['average_traded_price'] = fields[3] / divisor
+                    tick['volume_traded'] = fields[4]
+                    tick['total_buy_quantity'] = fields[5]
+                    tick['total_sell_quantity'] = fields[6]
+                
+                if length > 8:
+                    tick['ohlc'] = {'open': open_, 'high': high, 'low': low, 'close': close}
+                    tick['change'] = (ltp - close) * 100 / close if close != 0 else 0
+                if length == 32:
+                    tick['exchange_timestamp'] = _from_epoch(fields[6])
+                elif length == 184:
+                    tick['last_trade_time'] = _from_epoch(fields[11])
+                    tick['oi'] = fields[12]
+                    tick['oi_day_high'] = fields[13]
+                    tick['oi_day_low'] = fields[14]
+                    tick['exchange_timestamp'] = _from_epoch(fields[15])
+                ticks.append(tick)
+            return ticks
+    
+    return TunedKiteTicker
+
+class TickStore:
+    """
+    Latest tick per instrument, kept in preallocated NumPy columns
+    
+    Each token owns one row (assigned at subscribe time or on its first
+    tick), so ingesting a tick is a handful of array writes instead of a
+    fresh dict. Reads still look like the old {token: tick_dict} mapping;
+    the dict is only built when someone asks for it.
+    
+    The table is capped at max_rows: when it is full, the row that has gone
+    longest without a tick is recycled, and clear_stale() frees rows of
+    tokens that stopped ticking (e.g., strikes from earlier in the day).
+    
+    Ticks are written on the WebSocket thread while rows are assigned and
+    freed from the main thread and the trading loop, so every access to
+    the row map and columns holds one re-entrant lock.
+    """
+    
+    def __init__(self, capacity: int = 64, max_rows: int = 1024):
+        self.rows: Dict[int, int] = {}
+        self.row_tokens: List[Optional[int]] = []
+        self.max_rows = max_rows
+        self._next_row = 0
+        self._free_rows: List[int] = []
+        self._lock = threading.RLock()
+        self._allocate(min(capacity, max_rows))
+    
+    def _allocate(self, capacity: int):
+        """(Re)allocate the columns, keeping any rows already written"""
+        def grow(old, dtype):
+            new = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                new[:len(old)] = old
+            return new
+        
+        self.has_tick = grow(getattr(self, 'has_tick', None), np.bool_)
+        self.ltp = grow(getattr(self, 'ltp', None), np.float64)
+        self.open = grow(getattr(self, 'open', None), np.float64)
+        self.high = grow(getattr(self, 'high', None), np.float64)
+        self.low = grow(getattr(self, 'low', None), np.float64)
+        self.close = grow(getattr(self, 'close', None), np.float64)
+        self.volume = grow(getattr(self, 'volume', None), np.float64)
+        self.ts_ns = grow(getattr(self, 'ts_ns', None), np.int64)
+        # Local receive time (monotonic ns) of each row's last write, for staleness
+        self.seen_ns = grow(getattr(self, 'seen_ns', None), np.int64)
+        self.row_tokens.extend([None] * (capacity - len(self.row_tokens)))
+    
+    def row(self, token: int) -> int:
+        """Row for a token, assigning (and growing the columns) on first use"""
+        with self._lock:
+            row = self.rows.get(token)
+            if row is not None:
+                return row
+            
+            if self._free_rows:
+                row = self._free_rows.pop()
+            elif self._next_row < self.max_rows:
+                row = self._next_row
+                self._next_row += 1
+                if row == len(self.ltp):
+                    self._allocate(min(2 * len(self.ltp), self.max_rows))
+            else:
+                # Table full: recycle the least recently updated row
+                row = int(np.argmin(self.seen_ns))
+                del self.rows[self.row_tokens[row]]
+            
+            self.rows[token] = row
+            self.row_tokens[row] = token
+            self.has_tick[row] = False
+            self.seen_ns[row] = time.monotonic_ns()
+            return row
+    
+    def clear_stale(self, max_age_sec: float) -> int:
+        """
+        Free the rows of tokens with no tick for max_age_sec
+        
+        Returns:
+            Number of tokens dropped
+        """
+        cutoff = time.monotonic_ns() - int(max_age_sec * 1e9)
+        dropped = 0
+        with self._lock:
+            for row in np.flatnonzero(self.seen_ns[:self._next_row] < cutoff).tolist():
+                token = self.row_tokens[row]
+                if token is None:
+                    continue
+                self.discard(token)
+                dropped += 1
+        return dropped
+    
+    def discard(self, token: int):
+        """Forget a token and put its row back on the free list"""
+        with self._lock:
+            row = self.rows.pop(token, None)
+            if row is None:
+                return
+            self.row_tokens[row] = None
+            self.has_tick[row] = False
+            self._free_rows.append(row)
+    
+    def write(self, token: int, ltp: float, open_: float, high: float, low: float,
+              close: float, volume: float, ts_ns: int):
+        """Store one tick"""
+        with self._lock:
+            row = self.row(token)
+            self.ltp[row] = ltp
+            self.open[row] = open_
+            self.high[row] = high
+            self.low[row] = low
+            self.close[row] = close
+            self.volume[row] = volume
+            self.ts_ns[row] = ts_ns
+            self.seen_ns[row] = time.monotonic_ns()
+            self.has_tick[row] = True
+    
+    def _columns(self) -> tuple:
+        return (self.has_tick, self.ltp, self.open, self.high, self.low,
+                self.close, self.volume, self.ts_ns, self.seen_ns)
+    
+    def update(self, ticks: List[Dict], arrival_ns: Optional[int] = None):
+        """
+        Store a batch of KiteTicker ticks (the WebSocket hot path)
+        
+        Args:
+            ticks: Ticks from one WebSocket message
+            arrival_ns: Wall-clock arrival time (epoch ns); read here if not given
+        """
+        rows = self.rows
+        received_ns = time.monotonic_ns()
+        # Ticks without an exchange time (LTP mode) are stamped with the batch's arrival time
+        if arrival_ns is None:
+            arrival_ns = time.time_ns()
+        with self._lock:
+            has_tick, ltps, opens, highs, lows, closes, volumes, ts_ns, seen_ns = self._columns()
+            
+            for tick in ticks:
+                token = tick['instrument_token']
+                row = rows.get(token)
+                if row is None:
+                    row = self.row(token)
+                    # Columns may have been regrown for the new row
+                    has_tick, ltps, opens, highs, lows, closes, volumes, ts_ns, seen_ns = self._columns()
+                
+                # Full-mode ticks always carry the whole ohlc block; LTP-mode ticks carry none
+                ltp = tick['last_price']
+                ltps[row] = ltp
+                closes[row] = ltp
+                try:
+                    ohlc = tick['ohlc']
+                    opens[row] = ohlc['open']
+                    highs[row] = ohlc['high']
+                    lows[row] = ohlc['low']
+                except KeyError:
+                    opens[row] = highs[row] = lows[row] = ltp
+                volumes[row] = tick.get('volume', 0)
+                ts = tick.get('exchange_timestamp') or tick.get('timestamp')
+                ts_ns[row] = int(ts.timestamp() * 1e9) if ts else arrival_ns
+                seen_ns[row] = received_ns
+                has_tick[row] = True
+    
+    def get_ltp(self, token: int) -> Optional[float]:
+        """Latest LTP for a token, or None if no tick has arrived"""
+        with self._lock:
+            row = self.rows.get(token)
+            if row is None or not self.has_tick[row]:
+                return None
+            return float(self.ltp[row])
+    
+    def get(self, token: int, default=None) -> Optional[Dict]:
+        """Latest tick for a token as a dict (same keys as the old cache)"""
+        with self._lock:
+            row = self.rows.get(token)
+            if row is None or not self.has_tick[row]:
+                return default
+            return {
+                'ltp': float(self.ltp[row]),
+                'open': float(self.open[row]),
+                'high': float(self.high[row]),
+                'low': float(self.low[row]),
+                'close': float(self.close[row]),
+                'volume': int(self.volume[row]),
+                'timestamp': datetime.fromtimestamp(self.ts_ns[row] / 1e9)
+            }
+    
+    def __getitem__(self, token: int) -> Dict:
+        tick = self.get(token)
+        if tick is None:
+            raise KeyError(token)
+        return tick
+    
+    def __setitem__(self, token: int, tick: Dict):
+        """Store a tick given in the cache's own dict shape (e.g. when replaying candles)"""
+        ltp = tick['ltp']
+        self.write(
+            token,
+            ltp,
+            tick.get('open', ltp),
+            tick.get('high', ltp),
+            tick.get('low', ltp),
+            tick.get('close', ltp),
+            tick.get('volume', 0),
+            int(tick['timestamp'].timestamp() * 1e9) if 'timestamp' in tick else time.time_ns()
+        )
+    
+    def __contains__(self, token: int) -> bool:
+        with self._lock:
+            row = self.rows.get(token)
+            return row is not None and bool(self.has_tick[row])
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self.has_tick.sum())
+
 class BrokerAPI:
     """Broker API wrapper with KiteConnect and Mock support"""
     
     def __init__(self):
         self.connected = False
+        # Phase is fixed for the process (settings are frozen), so resolve it once
+        self._real = settings.is_using_real_data()
         self.kite = None
         self.kws = None
-        self.subscribed_tokens = []
+        self.subscribed_tokens: Set[int] = set()
         self.tick_callbacks = []
-        self.latest_ticks = {}  # Store latest ticks from WebSocket
+        self.latest_ticks = TickStore()  # Latest tick per token from WebSocket
         self.kws_connected = False
-        self.pending_tokens = []
+        self.pending_tokens: Set[int] = set()
+        # Unsubscribed tokens whose in-flight ticks should be ignored
+        self.dropped_tokens: Set[int] = set()
+        self._tick_queue = None
+        self._tick_consumer = None
+        # REST fallback results: {'ltp' | 'quote': {token: (value, monotonic time)}}
+        self._rest_cache: Dict[str, Dict[int, Tuple[object, float]]] = {'ltp': {}, 'quote': {}}
+        self._rest_lock = threading.Lock()
+        self._mock_ltp: Dict[int, float] = {}
 
 
 
@@ -33,29 +393,37 @@ class BrokerAPI:
         if not tokens:
             return
         # de-dupe against what we *believe* is already subscribed
-        current = set(self.subscribed_tokens or [])
-        to_add = [t for t in tokens if t not in current]
+        current = self.subscribed_tokens
+        to_add = [t for t in dict.fromkeys(tokens) if t not in current]
         if not to_add:
             return
+        for t in to_add:
+            self.latest_ticks.row(t)
         ws.subscribe(to_add)
         try:
-            ws.set_mode(ws.MODE_FULL, to_add)  # set mode only for the new tokens
+            # Set mode only for the new tokens; the bot reads nothing but last_price
+            ws.set_mode(ws.MODE_LTP, to_add)
         except Exception as e:
             logger.error(f"set_mode failed for {to_add}: {e}")
         # track after success
-        self.subscribed_tokens = list(current.union(to_add))
+        current.update(to_add)
         logger.info(f"✅ Subscribed new tokens: {to_add}")
 
     def connect(self):
         """Connect to broker based on phase"""
         try:
-            if settings.is_using_real_data():
+            if self._real:
                 # Phase 2 & 3: Real KiteConnect
                 from kiteconnect import KiteConnect
                 
-                self.kite = KiteConnect(api_key=settings.KITE_API_KEY)
+                self.kite = KiteConnect(api_key=settings.KITE_API_KEY, pool=REST_POOL)
+                self.kite.reqsession.headers['Connection'] = 'keep-alive'
                 self.kite.set_access_token(settings.KITE_ACCESS_TOKEN)
                 
+                # Faster JSON parsing for quotes and large historical pulls
+                if orjson is not None:
+                    self.kite.reqsession.hooks['response'].append(_orjson_response_hook)
+                
                 # Test connection
                 profile = self.kite.profile()
                 logger.info(f"✅ Connected to KiteConnect - User: {profile.get('user_name', 'N/A')}")
@@ -75,11 +443,9 @@ class BrokerAPI:
     
     def disconnect(self):
         """Disconnect from broker"""
-        if self.kws:
-            try:
-                self.kws.close()
-            except:
-                pass
+        self._close_ticker()
+        # No more ticks after the ticker closes; finish the queued ones
+        self._stop_tick_consumer()
         
         self.connected = False
         logger.info("Disconnected from broker")
@@ -89,21 +455,22 @@ class BrokerAPI:
         if not tokens:
             logger.warning("No tokens to add")
             return False
+        self.dropped_tokens.difference_update(tokens)
 
-        if not settings.is_using_real_data():
+        if not self._real:
             # mock
-            self.subscribed_tokens = list(set((self.subscribed_tokens or []) + tokens))
+            self.subscribed_tokens.update(tokens)
             logger.info(f"📝 Mock: Added tokens {tokens}")
             return True
 
         if not self.kws:
             logger.warning("WS not created yet; queuing tokens")
-            self.pending_tokens = list(set((self.pending_tokens or []) + tokens))
+            self.pending_tokens.update(tokens)
             return False
 
         if not self.kws_connected:
             logger.info("WS not connected; queuing tokens for next on_connect")
-            self.pending_tokens = list(set((self.pending_tokens or []) + tokens))
+            self.pending_tokens.update(tokens)
             return False
 
         # Connected: subscribe immediately
@@ -113,9 +480,82 @@ class BrokerAPI:
         except Exception as e:
             logger.error(f"Add tokens failed: {e}")
             # queue for retry on reconnect
-            self.pending_tokens = list(set((self.pending_tokens or []) + tokens))
+            self.pending_tokens.update(tokens)
             return False
 
+    def remove_tokens(self, tokens):
+        """Stop ticks for tokens nothing needs any more (unsubscribe, forget cached tick)"""
+        tokens = {int(t) for t in tokens if t is not None}
+        if not tokens:
+            return False
+        
+        self.subscribed_tokens.difference_update(tokens)
+        self.pending_tokens.difference_update(tokens)
+        for token in tokens:
+            self.latest_ticks.discard(token)
+        
+        if self._real and self.kws and self.kws_connected:
+            # Ticks already on the wire are filtered out until the token is added again
+            self.dropped_tokens.update(tokens)
+            try:
+                self.kws.unsubscribe(list(tokens))
+            except Exception as e:
+                logger.error(f"Unsubscribe failed for {sorted(tokens)}: {e}")
+                return False
+        
+        logger.info(f"🔕 Removed tokens: {sorted(tokens)}")
+        return True
+
+    def _start_tick_consumer(self, on_tick: Callable):
+        """
+        Run the user tick callback on its own thread
+        
+        The WebSocket thread only stores ticks and enqueues the batch; this
+        single consumer drains whatever has queued up and hands it to
+        on_tick as one list, so slow callbacks never stall tick ingest.
+        """
+        self._stop_tick_consumer()
+        queue = SimpleQueue()
+        
+        def drain():
+            while True:
+                batch = queue.get()
+                if batch is None:
+                    return
+                
+                # Coalesce batches that arrived while the last callback ran
+                stopping = False
+                while True:
+                    try:
+                        more = queue.get_nowait()
+                    except Empty:
+                        break
+                    if more is None:
+                        stopping = True
+                        break
+                    batch = batch + more
+                
+                try:
+                    on_tick(batch)
+                except Exception as e:
+                    logger.error(f"❌ Error in tick callback: {e}", exc_info=True)
+                
+                if stopping:
+                    return
+        
+        self._tick_queue = queue
+        self._tick_consumer = threading.Thread(target=drain, name='TickConsumer', daemon=True)
+        self._tick_consumer.start()
+    
+    def _stop_tick_consumer(self):
+        """Let the tick consumer finish queued batches and exit"""
+        if self._tick_consumer is None:
+            return
+        self._tick_queue.put(None)
+        self._tick_consumer.join(timeout=5)
+        self._tick_queue = None
+        self._tick_consumer = None
+    
     def _get_exchange_for_token(self, token: int) -> str:
         """
         Determine exchange (NSE/NFO) for a given token by looking up instruments.csv
@@ -126,29 +566,15 @@ class BrokerAPI:
         Returns:
             'NSE' for equity/index, 'NFO' for options
         """
-        try:
-            from data.instruments import instrument_manager
-            
-            # Look up token in instruments dataframe
-            instrument = instrument_manager.instruments_df[
-                instrument_manager.instruments_df['token'] == token
-            ]
-            
-            if not instrument.empty:
-                option_type = instrument.iloc[0]['option_type']
-                # EQ = Equity/Index on NSE, CE/PE = Options on NFO
-                if option_type == 'EQ':
-                    return 'NSE'
-                elif option_type in ['CE', 'PE']:
-                    return 'NFO'
-            
+        from data.instruments import instrument_manager
+        
+        instrument_key = instrument_manager.instrument_keys.get(int(token))
+        if instrument_key is None:
             # Default to NFO if not found (most instruments are options)
             logger.warning(f"Could not determine exchange for token {token}, defaulting to NFO")
             return 'NFO'
-            
-        except Exception as e:
-            logger.warning(f"Error determining exchange for token {token}: {e}, defaulting to NFO")
-            return 'NFO'
+        
+        return instrument_key.split(':', 1)[0]
     
     def get_historical_data(
         self,
@@ -159,7 +585,7 @@ class BrokerAPI:
     ) -> pd.DataFrame:
         """Fetch historical OHLC data"""
         
-        if settings.is_using_real_data():
+        if self._real:
             # Phase 2 & 3: Real KiteConnect data
             try:
                 # Map interval to Kite format
@@ -181,10 +607,17 @@ class BrokerAPI:
                     logger.warning(f"No historical data returned for token {token}")
                     return pd.DataFrame()
                 
-                df = pd.DataFrame(data)
-                df['datetime'] = pd.to_datetime(df['date'])
-                df.set_index('datetime', inplace=True)
-                df.drop('date', axis=1, inplace=True)
+                # Build column-wise: one pass per field instead of a dict-by-dict frame build
+                fields = [field for field in data[0] if field != 'date']
+                dates = [candle['date'] for candle in data]
+                if isinstance(dates[0], datetime) and dates[0].tzinfo is not None:
+                    # Kite hands back aware datetimes: go via epoch seconds instead of per-object parsing
+                    epoch = np.fromiter((d.timestamp() for d in dates), dtype=np.float64, count=len(dates))
+                    index = pd.to_datetime(epoch, unit='s', utc=True).tz_convert(settings.TIMEZONE)
+                else:
+                    index = pd.to_datetime(dates)
+                index = index.rename('datetime')
+                df = pd.DataFrame({field: [candle[field] for candle in data] for field in fields}, index=index)
                 
                 logger.info(f"Fetched {len(df)} candles for token {token}")
                 return df
@@ -196,57 +629,61 @@ class BrokerAPI:
         else:
             # Phase 1: Mock data
             logger.info(f"Using MOCK historical data for token {token}")
-            dates = pd.date_range(from_datetime, to_datetime, freq='1min')
-            df = pd.DataFrame({
-                'datetime': dates,
-                'open': 100.0,
-                'high': 105.0,
-                'low': 95.0,
-                'close': 102.0,
-                'volume': 1000
-            })
-            df['datetime'] = pd.to_datetime(df['datetime'])
-            df.set_index('datetime', inplace=True)
-            return df
+            dates = pd.date_range(from_datetime, to_datetime, freq='1min', name='datetime')
+            n = len(dates)
+            return pd.DataFrame({
+                'open': np.full(n, 100.0),
+                'high': np.full(n, 105.0),
+                'low': np.full(n, 95.0),
+                'close': np.full(n, 102.0),
+                'volume': np.full(n, 1000, dtype=np.int64)
+            }, index=dates)
     
     def start_websocket(self, tokens: List[int], on_tick: Callable):
         """Start WebSocket for real-time data"""
         
-        if settings.is_using_real_data():
+        if self._real:
             # Phase 2 & 3: Real KiteConnect WebSocket
             try:
-                from kiteconnect import KiteTicker
+                KiteTicker = _tuned_kite_ticker()
                 
                 self.kws = KiteTicker(
                     api_key=settings.KITE_API_KEY,
                     access_token=settings.KITE_ACCESS_TOKEN
                 )
                 
+                self._start_tick_consumer(on_tick)
+                tick_queue = self._tick_queue
+                
+                # Bound once so the per-batch path skips attribute lookups
+                store_ticks = self.latest_ticks.update
+                log_debug = logger.debug
+                dropped = self.dropped_tokens
+                
                 def on_ticks_wrapper(ws, ticks):
                     """Process incoming ticks"""
                     if not ticks:
-                        logger.debug("⚠️ Received empty ticks from WebSocket")
+                        log_debug("⚠️ Received empty ticks from WebSocket")
                         return
                     
-                    logger.debug(f"📡 WebSocket received {len(ticks)} tick(s)")
+                    log_debug("📡 WebSocket received %d tick(s)", len(ticks))
+                    
+                    if dropped:
+                        ticks = [tick for tick in ticks if tick['instrument_token'] not in dropped]
+                        if not ticks:
+                            return
                     
+                    # Kite ticks carry no 'timestamp'; stamp the message's arrival time
+                    # (epoch ns) here, before queueing, so candle bucketing doesn't
+                    # depend on consumer lag. Datetimes are built by the consumer.
+                    arrival_ns = time.time_ns()
                     for tick in ticks:
-                        token = tick['instrument_token']
-                        self.latest_ticks[token] = {
-                            'ltp': tick['last_price'],
-                            'open': tick.get('ohlc', {}).get('open', tick['last_price']),
-                            'high': tick.get('ohlc', {}).get('high', tick['last_price']),
-                            'low': tick.get('ohlc', {}).get('low', tick['last_price']),
-                            'close': tick['last_price'],
-                            'volume': tick.get('volume', 0),
-                            'timestamp': tick.get('timestamp', datetime.now())
-                        }
+                        tick['arrival_ns'] = arrival_ns
                     
-                    # Call user callback
-                    try:
-                        on_tick(ticks)
-                    except Exception as e:
-                        logger.error(f"❌ Error in tick callback: {e}", exc_info=True)
+                    store_ticks(ticks, arrival_ns)
+                    
+                    # User callback runs on the consumer thread
+                    tick_queue.put(ticks)
                 
                 def on_connect_wrapper(ws, response):
                     self.kws_connected = True
@@ -256,16 +693,14 @@ class BrokerAPI:
                     logger.info(f"📡 Response: {response}")
                     
                     # (Re)subscribe base + any queued tokens
-                    base = [int(t) for t in (self.subscribed_tokens or [])]
-                    queued = [int(t) for t in (self.pending_tokens or [])]
-                    want = list(set(base + queued))
+                    want = list(self.subscribed_tokens | self.pending_tokens)
                     
                     logger.info(f"📊 Tokens to subscribe: {want}")
                     
                     if want:
                         self._safe_subscribe(ws, want)
                     # clear queue after attempting
-                    self.pending_tokens = []
+                    self.pending_tokens.clear()
                     logger.info(f"✅ Subscribed to {len(self.subscribed_tokens)} instruments")
                     logger.info("=" * 80)
 
@@ -281,8 +716,10 @@ class BrokerAPI:
                 self.kws.on_close = on_close_wrapper
                 self.kws.on_error = on_error_wrapper
                 
+                # Twisted drives the socket from its epoll reactor thread; the tick
+                # handler only enqueues, so socket reads never wait on tick processing
                 self.kws.connect(threaded=True)
-                self.subscribed_tokens = tokens
+                self.subscribed_tokens = {int(t) for t in tokens}
                 logger.info("🔗 KiteConnect WebSocket started")
                 
             except ImportError:
@@ -294,89 +731,122 @@ class BrokerAPI:
         
         else:
             # Phase 1: Mock WebSocket (just store callback)
-            self.subscribed_tokens = tokens
+            self.subscribed_tokens = {int(t) for t in tokens}
             self.tick_callbacks.append(on_tick)
             logger.info(f"📝 Mock WebSocket started for {len(tokens)} tokens")
     
+    def _close_ticker(self):
+        """Close the ticker once; later calls (e.g. disconnect after stop_websocket) are no-ops"""
+        kws, self.kws = self.kws, None
+        if kws is None:
+            return
+        self.kws_connected = False
+        try:
+            kws.close()
+        except Exception as e:
+            logger.debug(f"kws close: {e}")
+    
     def stop_websocket(self):
         """Stop WebSocket connection"""
-        if self.kws:
-            try:
-                self.kws.close()
-            except:
-                pass
+        self._close_ticker()
         
-        self.subscribed_tokens = []
+        self._stop_tick_consumer()
+        self.subscribed_tokens.clear()
+        self.dropped_tokens.clear()
         self.tick_callbacks = []
         logger.info("WebSocket stopped")
     
     def get_ltp(self, token: int) -> Optional[float]:
         """Get Last Traded Price"""
         
-        if settings.is_using_real_data():
+        if self._real:
             # Phase 2 & 3: Real KiteConnect data
             
             # First try from WebSocket ticks (faster)
-            if token in self.latest_ticks:
-                return self.latest_ticks[token]['ltp']
+            ltp = self.latest_ticks.get_ltp(token)
+            if ltp is not None:
+                return ltp
             
-            # Fallback to REST API using trading symbol
-            try:
-                from data.instruments import instrument_manager
-                
-                # Get trading symbol (e.g., 'NSE:NIFTY 50' or 'NFO:NIFTY25O0725000CE')
-                trading_symbol = instrument_manager.get_trading_symbol(token)
-                
+            # Fallback to REST API (briefly cached)
+            return self._rest_lookup('ltp', [token]).get(token)
+        
+        else:
+            # Phase 1: Mock LTP (some variation based on token), memoised per token
+            ltp = self._mock_ltp.get(token)
+            if ltp is None:
+                ltp = self._mock_ltp[token] = 100.0 + (token % 100)
+            return ltp
+    
+    def _rest_lookup(self, kind: str, tokens: List[int]) -> Dict:
+        """
+        Fetch LTPs ('ltp') or full quotes ('quote') over REST, one call for all tokens
+        
+        Results younger than REST_CACHE_TTL are reused. Fetches are serialised,
+        so a caller that waited on another caller's fetch finds its tokens cached.
+        """
+        cache = self._rest_cache[kind]
+        
+        def fresh(token):
+            entry = cache.get(token)
+            if entry is not None and time.monotonic() - entry[1] < REST_CACHE_TTL:
+                return entry[0]
+            return None
+        
+        results = {}
+        for token in tokens:
+            value = fresh(token)
+            if value is not None:
+                results[token] = value
+        if len(results) == len(tokens):
+            return results
+        
+        with self._rest_lock:
+            from data.instruments import instrument_manager
+            
+            # Trading symbols (e.g., 'NSE:NIFTY 50' or 'NFO:NIFTY25O0725000CE') of tokens still needed
+            symbols = {}
+            for token in tokens:
+                if token in results:
+                    continue
+                value = fresh(token)
+                if value is not None:
+                    results[token] = value
+                    continue
+                trading_symbol = instrument_manager.instrument_keys.get(int(token))
                 if not trading_symbol:
                     logger.error(f"Could not find trading symbol for token {token}")
-                    return None
-                
-                ltp_data = self.kite.ltp([trading_symbol])
-                return ltp_data[trading_symbol]['last_price']
+                    continue
+                symbols[trading_symbol] = token
+            
+            if not symbols:
+                return results
+            
+            try:
+                fetch = self.kite.ltp if kind == 'ltp' else self.kite.quote
+                data = fetch(list(symbols))
             except Exception as e:
-                logger.error(f"Error fetching LTP for token {token}: {e}")
-                return None
+                logger.error(f"Error fetching {kind} for tokens {list(symbols.values())}: {e}")
+                return results
+            
+            fetched_at = time.monotonic()
+            for trading_symbol, token in symbols.items():
+                item = data.get(trading_symbol)
+                if item is None:
+                    continue
+                value = item['last_price'] if kind == 'ltp' else item
+                cache[token] = (value, fetched_at)
+                results[token] = value
         
-        else:
-            # Phase 1: Mock LTP
-            return 100.0 + (token % 100)  # Some variation based on token
+        return results
     
     def get_quote(self, token: int) -> Optional[Dict]:
         """Get full quote (OHLC, LTP, volume)"""
         
-        if settings.is_using_real_data():
+        if self._real:
             # Phase 2 & 3: Real KiteConnect data
-            
-            # Try from WebSocket first
-            if token in self.latest_ticks:
-                tick = self.latest_ticks[token]
-                return {
-                    'last_price': tick['ltp'],
-                    'ohlc': {
-                        'open': tick['open'],
-                        'high': tick['high'],
-                        'low': tick['low'],
-                        'close': tick['close']
-                    },
-                    'volume': tick['volume']
-                }
-            
-            # Fallback to REST API using trading symbol
-            try:
-                from data.instruments import instrument_manager
-                
-                # Get trading symbol (e.g., 'NSE:NIFTY 50' or 'NFO:NIFTY25O0725000CE')
-                trading_symbol = instrument_manager.get_trading_symbol(token)
-                
-                if not trading_symbol:
-                    logger.error(f"Could not find trading symbol for token {token}")
-                    return None
-                
-                quote = self.kite.quote([trading_symbol])
-                return quote[trading_symbol]
-            except Exception as e:
-                logger.error(f"Error fetching quote for token {token}: {e}")
-                return None
+            # WebSocket ticks are LTP-mode (no OHLC/volume), so quotes always come
+            # from REST (briefly cached)
+            return self._rest_lookup('quote', [token]).get(token)
         
         else:
             # Phase 1: Mock quote
@@ -394,6 +864,12 @@ class BrokerAPI:
     def get_tick_data(self, token: int) -> Optional[Dict]:
         """Get latest tick from WebSocket cache"""
         return self.latest_ticks.get(token)
+    
+    def clear_stale_ticks(self, max_age_sec: float = STALE_TICK_SECONDS):
+        """Forget cached ticks of tokens that have stopped ticking"""
+        dropped = self.latest_ticks.clear_stale(max_age_sec)
+        if dropped:
+            logger.info(f"🧹 Dropped {dropped} stale token(s) from tick cache")
 
 # Global instance
 broker_api = BrokerAPI()
\ No newline at end of file
@@ -1,8 +1,10 @@
 """
 Instrument management - Load and manage strike data
 """
+import os
 import pandas as pd
-from typing import Optional, Dict, List
+import numpy as np
+from typing import Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
 from config.settings import settings
 from utils.logger import setup_logger
@@ -21,24 +23,101 @@ class InstrumentManager:
         """
         self.csv_path = csv_path or settings.INSTRUMENTS_CSV_PATH
         self.instruments_df: Optional[pd.DataFrame] = None
+        # token -> 'EXCHANGE:SYMBOL' (e.g., 'NSE:NIFTY 50' or 'NFO:NIFTY25O0725000CE')
+        self.instrument_keys: Dict[int, str] = {}
+        # expiry -> {(strike, option_type): position in instrument_records}
+        self.option_chains: Dict[pd.Timestamp, Dict[Tuple[float, str], int]] = {}
+        # One ready-made get_strike_data result per row
+        self.instrument_records: List[Dict] = []
+        # Sorted unique option (CE/PE) expiries, plus the same as day numbers for searchsorted
+        self.option_expiries = pd.DatetimeIndex([])
+        self._option_expiry_days = np.array([], dtype='datetime64[D]')
+        self.nifty_token: Optional[int] = None
         self.load_instruments()
     
     def load_instruments(self):
-        """Load instruments from CSV file"""
+        """
+        Load instruments from CSV file
+        
+        The parsed frame is cached as Parquet next to the CSV and reused
+        until the CSV is newer than the cache.
+        """
         try:
-            self.instruments_df = pd.read_csv(self.csv_path)
-            logger.info(f"Loaded {len(self.instruments_df)} instruments from {self.csv_path}")
+            cache_path = f"{self.csv_path}.parquet"
+            self.instruments_df = None
             
-            # Expected columns: symbol, token, strike, expiry, option_type, lot_size
-            required_cols = ['symbol', 'token', 'strike', 'expiry', 'option_type', 'lot_size']
-            missing_cols = [col for col in required_cols if col not in self.instruments_df.columns]
+            if os.path.exists(cache_path) and os.path.getmtime(cache_path) > os.path.getmtime(self.csv_path):
+                try:
+                    self.instruments_df = pd.read_parquet(cache_path)
+                    logger.info(f"Loaded {len(self.instruments_df)} instruments from cache {cache_path}")
+                except Exception as e:
+                    logger.warning(f"Could not read cache {cache_path}, rebuilding: {e}")
             
-            if missing_cols:
-                logger.error(f"Missing required columns: {missing_cols}")
-                raise ValueError(f"CSV missing columns: {missing_cols}")
+            if self.instruments_df is None:
+                self.instruments_df = pd.read_csv(self.csv_path)
+                logger.info(f"Loaded {len(self.instruments_df)} instruments from {self.csv_path}")
+                
+                # Expected columns: symbol, token, strike, expiry, option_type, lot_size
+                required_cols = ['symbol', 'token', 'strike', 'expiry', 'option_type', 'lot_size']
+                missing_cols = [col for col in required_cols if col not in self.instruments_df.columns]
+                
+                if missing_cols:
+                    logger.error(f"Missing required columns: {missing_cols}")
+                    raise ValueError(f"CSV missing columns: {missing_cols}")
+                
+                # Convert expiry to datetime (download_instruments.py writes YYYY-MM-DD)
+                self.instruments_df['expiry'] = pd.to_datetime(
+                    self.instruments_df['expiry'], format='%Y-%m-%d', cache=True
+                )
+                
+                # Narrowest exact dtypes: a handful of option types, small integral strikes/lot sizes
+                self.instruments_df['option_type'] = self.instruments_df['option_type'].astype('category')
+                for col in ('strike', 'lot_size'):
+                    self.instruments_df[col] = pd.to_numeric(self.instruments_df[col], downcast='integer')
+                
+                try:
+                    self.instruments_df.to_parquet(cache_path)
+                except Exception as e:
+                    logger.warning(f"Could not write cache {cache_path}: {e}")
+            
+            # Pull each column out of pandas once and build every lookup table in a
+            # single pass over plain lists (first row wins for duplicate keys, like
+            # the old mask + iloc[0] lookups)
+            df = self.instruments_df
+            self.instrument_keys = {}
+            self.instrument_records = []
+            self.option_chains = {}
+            rows = zip(
+                df['symbol'].astype(str).tolist(), df['token'].astype(int).tolist(),
+                df['lot_size'].tolist(), df['strike'].tolist(),
+                df['option_type'].tolist(), df['expiry'].tolist()
+            )
+            for i, (symbol, token, lot_size, strike, option_type, expiry) in enumerate(rows):
+                exchange = 'NSE' if option_type in ('EQ', 'INDEX') else 'NFO'
+                self.instrument_keys.setdefault(token, f"{exchange}:{symbol}")
+                self.instrument_records.append({
+                    'symbol': symbol,
+                    'token': token,
+                    'lot_size': int(lot_size),
+                    'strike': int(strike),
+                    'option_type': option_type,
+                    'expiry': expiry
+                })
+                self.option_chains.setdefault(expiry, {}).setdefault((float(strike), option_type), i)
             
-            # Convert expiry to datetime
-            self.instruments_df['expiry'] = pd.to_datetime(self.instruments_df['expiry'])
+            self.option_expiries = pd.DatetimeIndex(
+                df.loc[df['option_type'].isin(['CE', 'PE']), 'expiry'].unique()
+            ).sort_values()
+            self._option_expiry_days = self.option_expiries.to_numpy().astype('datetime64[D]')
+            
+            # Nifty spot: first NIFTY symbol that is not an option (plain substring checks, no regex)
+            symbols = df['symbol'].astype(str)
+            is_spot = (
+                symbols.str.contains('NIFTY', regex=False) &
+                ~symbols.str.contains('CE', regex=False) &
+                ~symbols.str.contains('PE', regex=False)
+            ).to_numpy()
+            self.nifty_token = int(df['token'].iat[is_spot.argmax()]) if is_spot.any() else None
             
         except FileNotFoundError:
             logger.error(f"Instruments CSV not found at {self.csv_path}")
@@ -76,25 +155,19 @@ class InstrumentManager:
         if from_date is None:
             from_date = datetime.now()
         
-        # Filter only option instruments (CE/PE), exclude index/equity
-        options_df = self.instruments_df[
-            self.instruments_df['option_type'].isin(['CE', 'PE'])
-        ]
-        
-        # Get unique expiry dates from options only
-        expiries = sorted(options_df['expiry'].unique())
+        expiries = self.option_expiries
         
         # Compare only dates (not time) to find nearest expiry >= today
         from_date_only = from_date.date() if hasattr(from_date, 'date') else from_date
+        i = int(np.searchsorted(self._option_expiry_days, np.datetime64(from_date_only, 'D')))
         
-        for expiry in expiries:
-            expiry_date = expiry.date() if hasattr(expiry, 'date') else expiry
-            if expiry_date >= from_date_only:
-                logger.info(f"Nearest weekly expiry: {expiry.date()}")
-                return expiry
+        if i < len(expiries):
+            expiry = expiries[i]
+            logger.info(f"Nearest weekly expiry: {expiry.date()}")
+            return expiry
         
         logger.warning("No future expiry found, using last available")
-        return expiries[-1] if expiries else from_date
+        return expiries[-1] if len(expiries) else from_date
     
     def get_strike_data(self, strike: int, option_type: str, expiry: datetime = None) -> Optional[Dict]:
         """
@@ -111,42 +184,21 @@ class InstrumentManager:
         if expiry is None:
             expiry = self.get_nearest_weekly_expiry()
         
-        # Filter for matching strike, option_type, and expiry
-        mask = (
-            (self.instruments_df['strike'] == strike) &
-            (self.instruments_df['option_type'] == option_type) &
-            (self.instruments_df['expiry'] == expiry)
-        )
+        chain = self.option_chains.get(pd.Timestamp(expiry))
+        i = chain.get((float(strike), option_type)) if chain is not None else None
         
-        result = self.instruments_df[mask]
-        
-        if result.empty:
+        if i is None:
             logger.warning(f"No data found for {strike} {option_type} expiring {expiry.date()}")
             return None
         
-        row = result.iloc[0]
-        return {
-            'symbol': row['symbol'],
-            'token': row['token'],
-            'lot_size': int(row['lot_size']),
-            'strike': int(row['strike']),
-            'option_type': row['option_type'],
-            'expiry': row['expiry']
-        }
+        # Shallow copy so callers can't alter the shared record
+        return dict(self.instrument_records[i])
     
     def get_nifty_token(self) -> Optional[int]:
-        """Get Nifty spot token"""
-        # Assuming Nifty spot is marked with strike=0 or specific symbol
-        nifty = self.instruments_df[
-            (self.instruments_df['symbol'].str.contains('NIFTY')) &
-            (~self.instruments_df['symbol'].str.contains('CE|PE'))
-        ]
-        
-        if not nifty.empty:
-            return int(nifty.iloc[0]['token'])
-        
-        logger.warning("Nifty spot token not found in instruments CSV")
-        return None
+        """Get Nifty spot token (resolved once in load_instruments)"""
+        if self.nifty_token is None:
+            logger.warning("Nifty spot token not found in instruments CSV")
+        return self.nifty_token
     
     def get_trading_symbol(self, token: int) -> Optional[str]:
         """
@@ -158,30 +210,10 @@ class InstrumentManager:
         Returns:
             Trading symbol with exchange prefix (e.g., 'NSE:NIFTY 50' or 'NFO:NIFTY25O0725000CE')
         """
-        try:
-            instrument = self.instruments_df[self.instruments_df['token'] == token]
-            
-            if not instrument.empty:
-                row = instrument.iloc[0]
-                symbol = row['symbol']
-                option_type = row['option_type']
-                
-                # Determine exchange based on option type
-                if option_type == 'EQ' or option_type == 'INDEX':
-                    exchange = 'NSE'
-                elif option_type in ['CE', 'PE']:
-                    exchange = 'NFO'
-                else:
-                    exchange = 'NFO'  # Default to NFO
-                
-                return f"{exchange}:{symbol}"
-            
+        key = self.instrument_keys.get(token)
+        if key is None:
             logger.warning(f"Trading symbol not found for token {token}")
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error getting trading symbol for token {token}: {e}")
-            return None
+        return key
     
     def validate_strike_liquidity(self, strike: int, option_type: str) -> bool:
         """
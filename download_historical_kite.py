@@ -2,39 +2,66 @@
 Download historical 1-minute candles from KiteConnect
 """
 from kiteconnect import KiteConnect
+from kiteconnect.exceptions import NetworkException
 import pandas as pd
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import os
+import time
 import argparse
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def download_instrument_data(kite, instrument_token, from_date, to_date, interval='minute'):
-    """Download data for one instrument"""
-    all_data = []
-    current_date = from_date
-    print(current_date, to_date)
-    while current_date <= to_date:
-        chunk_end = min(current_date + timedelta(days=59), to_date)
-        
-        print(f"  Fetching {current_date.date()} to {chunk_end.date()}...")
-        
+# Kite allows ~3 historical requests/sec, so keep the fan-out small
+MAX_CHUNK_WORKERS = 3
+RATE_LIMIT_RETRIES = 5
+
+def fetch_chunk(kite, instrument_token, from_date, to_date, interval):
+    """Fetch one date chunk, backing off and retrying when Kite rate-limits (HTTP 429)"""
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
         try:
-            data = kite.historical_data(
+            return kite.historical_data(
                 instrument_token=instrument_token,
-                from_date=current_date,
-                to_date=chunk_end,
+                from_date=from_date,
+                to_date=to_date,
                 interval=interval
             )
-            all_data.extend(data)
-        except Exception as e:
-            print(f"  Error: {e}")
-        
+        except NetworkException as e:
+            if e.code != 429 or attempt == RATE_LIMIT_RETRIES:
+                raise
+            time.sleep(0.5 * 2 ** attempt)
+
+def submit_instrument_chunks(executor, kite, instrument_token, from_date, to_date, interval='minute'):
+    """Queue one instrument's 59-day chunks on a shared executor; returns (token, [(start, end, future)])"""
+    pending = []
+    current_date = from_date
+    while current_date <= to_date:
+        chunk_end = min(current_date + timedelta(days=59), to_date)
+        future = executor.submit(fetch_chunk, kite, instrument_token, current_date, chunk_end, interval)
+        pending.append((current_date, chunk_end, future))
         current_date = chunk_end + timedelta(days=1)
-    
+    return instrument_token, pending
+
+def collect_instrument_chunks(submitted) -> pd.DataFrame:
+    """Wait for an instrument's chunks in submission order so candles stay chronological"""
+    instrument_token, pending = submitted
+    all_data = []
+    for start, end, future in pending:
+        print(f"  [{instrument_token}] Fetching {start.date()} to {end.date()}...")
+        try:
+            all_data.extend(future.result())
+        except Exception as e:
+            print(f"  [{instrument_token}] Error: {e}")
     return pd.DataFrame(all_data)
 
+def download_instrument_data(kite, instrument_token, from_date, to_date, interval='minute'):
+    """Download data for one instrument (59-day chunks, fetched concurrently)"""
+    with ThreadPoolExecutor(max_workers=MAX_CHUNK_WORKERS) as ex:
+        return collect_instrument_chunks(
+            submit_instrument_chunks(ex, kite, instrument_token, from_date, to_date, interval)
+        )
+
 def main():
     """Download historical data for Nifty and options"""
     
@@ -77,19 +104,17 @@ def main():
     print(f"Output File: {output_file}")
     print("="*80)
     
-    # Download Nifty
-    print("\n📊 Downloading Nifty 50 data...")
-    nifty_df = download_instrument_data(kite, args.nifty_token, from_date, to_date)
+    # Download Nifty, Call and Put side by side: every chunk of all three goes
+    # through one pool, so total in-flight requests stay within Kite's rate limit
+    print("\n📊 Downloading Nifty 50, Call and Put option data...")
+    with ThreadPoolExecutor(max_workers=MAX_CHUNK_WORKERS) as ex:
+        submitted = [
+            submit_instrument_chunks(ex, kite, token, from_date, to_date)
+            for token in (args.nifty_token, args.call_token, args.put_token)
+        ]
+        nifty_df, call_df, put_df = (collect_instrument_chunks(s) for s in submitted)
     print(f"✅ Got {len(nifty_df)} Nifty candles")
-    
-    # Download Call
-    print("\n📊 Downloading Call option data...")
-    call_df = download_instrument_data(kite, args.call_token, from_date, to_date)
     print(f"✅ Got {len(call_df)} Call candles")
-    
-    # Download Put
-    print("\n📊 Downloading Put option data...")
-    put_df = download_instrument_data(kite, args.put_token, from_date, to_date)
     print(f"✅ Got {len(put_df)} Put candles")
     
     # Check if we have data
@@ -103,45 +128,17 @@ def main():
     # Merge data
     print("\n🔄 Merging data...")
     
-    # Rename columns
-    nifty_df = nifty_df.rename(columns={
-        'date': 'datetime',
-        'open': 'nifty_open',
-        'high': 'nifty_high',
-        'low': 'nifty_low',
-        'close': 'nifty_close'
-    })
-    
-    call_df = call_df.rename(columns={
-        'date': 'datetime',
-        'open': 'call_open',
-        'high': 'call_high',
-        'low': 'call_low',
-        'close': 'call_close'
-    })
-    
-    put_df = put_df.rename(columns={
-        'date': 'datetime',
-        'open': 'put_open',
-        'high': 'put_high',
-        'low': 'put_low',
-        'close': 'put_close'
-    })
-    
-    # Merge on datetime
-    merged = nifty_df[['datetime', 'nifty_open', 'nifty_high', 'nifty_low', 'nifty_close']]
-    merged = merged.merge(
-        call_df[['datetime', 'call_open', 'call_high', 'call_low', 'call_close']],
-        on='datetime',
-        how='inner'
-    )
-    merged = merged.merge(
-        put_df[['datetime', 'put_open', 'put_high', 'put_low', 'put_close']],
-        on='datetime',
-        how='inner'
-    )
-    
-    # Save
+    # Keep only OHLC per instrument (prefixed), skipping candles with missing prices,
+    # and align all three on datetime in a single inner join
+    frames = [
+        df.set_index('date')[['open', 'high', 'low', 'close']].dropna().add_prefix(f'{prefix}_')
+        for prefix, df in (('nifty', nifty_df), ('call', call_df), ('put', put_df))
+    ]
+    merged = pd.concat(frames, axis=1, join='inner').rename_axis('datetime').reset_index()
+    
+    # Save (float32 prints the same 2-decimal prices as float64, but formats faster)
+    price_cols = merged.columns.drop('datetime')
+    merged[price_cols] = merged[price_cols].astype('float32')
     merged.to_csv(output_file, index=False)
     
     print(f"\n✅ Saved {len(merged)} rows to {output_file}")
@@ -10,6 +10,18 @@ from datetime import datetime
 
 load_dotenv()
 
+# Columns kept from Kite's instrument dump, in our CSV's order
+INSTRUMENT_COLUMNS = ['tradingsymbol', 'instrument_token', 'strike', 'expiry', 'instrument_type', 'lot_size']
+
+def read_instruments(kite, exchange: str) -> pd.DataFrame:
+    """
+    Instrument dump for one exchange as a DataFrame (only the columns we use)
+    
+    Built straight from kite.instruments() records, so the per-contract dicts
+    are never filtered or copied in Python.
+    """
+    return pd.DataFrame.from_records(kite.instruments(exchange), columns=INSTRUMENT_COLUMNS + ['name'])
+
 def main():
     # Load credentials
     api_key = os.getenv('KITE_API_KEY')
@@ -35,55 +47,31 @@ def main():
         
         print("\n🔄 Downloading instruments...")
         
-        # Get NFO instruments (Nifty options)
-        nfo_instruments = kite.instruments("NFO")
-        
-        # Filter for NIFTY options only
-        nifty_options = [
-            inst for inst in nfo_instruments 
-            if inst['name'] == 'NIFTY' and inst['instrument_type'] in ['CE', 'PE']
+        # Get NFO instruments (Nifty options only)
+        nfo_instruments = read_instruments(kite, "NFO")
+        nifty_options = nfo_instruments[
+            (nfo_instruments['name'] == 'NIFTY') & nfo_instruments['instrument_type'].isin(['CE', 'PE'])
         ]
         
         print(f"   Found {len(nifty_options)} NIFTY option contracts")
         
         # Get Nifty 50 Index
-        nse_instruments = kite.instruments("NSE")
-        nifty_index = [
-            inst for inst in nse_instruments
-            if inst['tradingsymbol'] == 'NIFTY 50'
-        ]
+        nse_instruments = read_instruments(kite, "NSE")
+        nifty_index = nse_instruments[nse_instruments['tradingsymbol'] == 'NIFTY 50']
         
-        if nifty_index:
+        if not nifty_index.empty:
             print(f"   Found NIFTY 50 index")
         
-        # Combine all instruments
-        all_instruments = nifty_index + nifty_options
-        
-        # Convert to our CSV format
-        df_mapped = pd.DataFrame({
-            'symbol': [inst['tradingsymbol'] for inst in all_instruments],
-            'token': [inst['instrument_token'] for inst in all_instruments],
-            'strike': [inst.get('strike', 0) for inst in all_instruments],
-            'expiry': [inst.get('expiry', '') for inst in all_instruments],  # Keep as string initially
-            'option_type': [inst.get('instrument_type', 'INDEX') for inst in all_instruments],
-            'lot_size': [inst['lot_size'] for inst in all_instruments]
-        })
-        
-        # Convert expiry to string format (YYYY-MM-DD)
-        def format_expiry(expiry):
-            if expiry == '' or pd.isna(expiry):
-                return datetime.now().strftime('%Y-%m-%d')
-            if isinstance(expiry, str):
-                try:
-                    return pd.to_datetime(expiry).strftime('%Y-%m-%d')
-                except:
-                    return expiry
-            try:
-                return expiry.strftime('%Y-%m-%d')
-            except:
-                return str(expiry)
-        
-        df_mapped['expiry'] = df_mapped['expiry'].apply(format_expiry)
+        # Combine and convert to our CSV format
+        df_mapped = pd.concat([nifty_index, nifty_options], ignore_index=True)[INSTRUMENT_COLUMNS].rename(columns={
+            'tradingsymbol': 'symbol',
+            'instrument_token': 'token',
+            'instrument_type': 'option_type'
+        }).fillna({'strike': 0, 'option_type': 'INDEX'})
+        
+        # Convert expiry to string format (YYYY-MM-DD); missing expiries (index) get today's date
+        expiries = pd.to_datetime(df_mapped['expiry'], errors='coerce')
+        df_mapped['expiry'] = expiries.dt.strftime('%Y-%m-%d').fillna(datetime.now().strftime('%Y-%m-%d'))
         
         # Sort by expiry and strike
         df_mapped = df_mapped.sort_values(['expiry', 'strike', 'option_type'])
@@ -3,15 +3,43 @@ Order execution with phase support
 Phase 1 & 2: Paper trading (mock orders)
 Phase 3: Real orders via AlgoTest
 """
+import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 from typing import Dict, Optional
 from config.settings import settings
 from utils.logger import get_logger
 from utils.helpers import generate_trade_id
 
+try:
+    import orjson
+except ImportError:
+    # orjson is optional - order bodies fall back to the stdlib json encoder
+    orjson = None
+
 logger = get_logger(__name__)
 
+def _encode_json(payload: Dict) -> bytes:
+    """Serialise an order payload to a JSON request body"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+class _LoggedRetry(Retry):
+    """urllib3 Retry that logs each order retry (the adapter retries silently otherwise)"""
+    
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        # Raises MaxRetryError once attempts are used up, so only real retries are logged
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        cause = f"HTTP {response.status}" if response is not None and response.status else repr(error)
+        logger.warning(
+            f"Order API error ({cause}); retry {len(retry.history)}/{self.total + len(self.history)} "
+            f"in {retry.get_backoff_time():.1f}s"
+        )
+        return retry
+
 class OrderManager:
     """Manage order execution based on trading phase"""
     
@@ -24,6 +52,23 @@ class OrderManager:
             'Content-Type': 'application/json'
         }
         self.max_retries = 3
+        
+        # One keep-alive session so orders reuse a warm TLS connection. Failed
+        # attempts are retried inside the adapter with short backoff (POST is
+        # safe to replay because every order carries an Idempotency-Key).
+        # Connection errors, timeouts, 429 and 5xx are retried; other 4xx are
+        # rejections and fail at once. Retry-After is ignored so a long server
+        # hint can't hold the trading loop (and exit orders) for minutes.
+        retry = _LoggedRetry(
+            total=self.max_retries - 1,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=None,
+            respect_retry_after_header=False
+        )
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
     
     def place_entry_order(
         self,
@@ -90,49 +135,40 @@ class OrderManager:
     def _send_real_order(self, payload: Dict, idempotency_key: str) -> Dict:
         """Send real order to AlgoTest API (Phase 3 only)"""
         
-        headers = self.headers.copy()
-        headers['Idempotency-Key'] = idempotency_key
+        # Auth and Content-Type come from the session; only the key varies per order
+        headers = {'Idempotency-Key': idempotency_key}
+        body = _encode_json(payload)
         
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                logger.info(f"Sending {payload['signal_type']} order (attempt {attempt}/{self.max_retries})")
-                
-                response = requests.post(
-                    f"{self.base_url}/signals",  # Adjust endpoint as per AlgoTest docs
-                    json=payload,
-                    headers=headers,
-                    timeout=10
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                logger.info(f"✅ Order placed successfully: {result}")
-                return result
-                
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Order API error (attempt {attempt}): {e}")
-                
-                if attempt < self.max_retries:
-                    wait_time = 2 ** attempt
-                    logger.info(f"Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    logger.error("Max retries exceeded. Order failed.")
-                    return {
-                        'status': 'error',
-                        'message': str(e),
-                        'payload': payload
-                    }
+        try:
+            logger.info(f"Sending {payload['signal_type']} order (up to {self.max_retries} attempts)")
             
-            except Exception as e:
-                logger.error(f"Unexpected error: {e}")
-                return {
-                    'status': 'error',
-                    'message': str(e),
-                    'payload': payload
-                }
+            response = self.session.post(
+                f"{self.base_url}/signals",  # Adjust endpoint as per AlgoTest docs
+                data=body,
+                headers=headers,
+                timeout=10
+            )
+            response.raise_for_status()
+            
+            result = response.json()
+            logger.info(f"✅ Order placed successfully: {result}")
+            return result
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Order API error, order failed: {e}")
+            return {
+                'status': 'error',
+                'message': str(e),
+                'payload': payload
+            }
         
-        return {'status': 'error', 'message': 'Unknown error'}
+        except Exception as e:
+            logger.error(f"Unexpected error: {e}")
+            return {
+                'status': 'error',
+                'message': str(e),
+                'payload': payload
+            }
     
     def _simulate_order(self, payload: Dict) -> Dict:
         """Simulate order for paper trading (Phase 1 & 2)"""
@@ -158,9 +194,8 @@ class OrderManager:
         if settings.is_live_trading():
             # Phase 3: Real order status
             try:
-                response = requests.get(
+                response = self.session.get(
                     f"{self.base_url}/orders/{order_id}",
-                    headers=self.headers,
                     timeout=10
                 )
                 return response.json()
@@ -181,9 +216,8 @@ class OrderManager:
         if settings.is_live_trading():
             # Phase 3: Real cancellation
             try:
-                response = requests.delete(
+                response = self.session.delete(
                     f"{self.base_url}/orders/{order_id}",
-                    headers=self.headers,
                     timeout=10
                 )
                 logger.info(f"Order {order_id} cancelled")
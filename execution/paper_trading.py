@@ -1,18 +1,27 @@
 """
 Paper trading simulation and logging
 """
+import atexit
 import csv
 import os
+from functools import lru_cache
+from operator import attrgetter
 from typing import Dict, List, Optional
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from config.settings import settings
 from utils.logger import get_logger
 from utils.helpers import get_current_time, calculate_pnl, format_time
 
 logger = get_logger(__name__)
 
-@dataclass
+_PAPER_TRADE_FIELDS = (
+    'trade_id', 'timestamp', 'action', 'symbol', 'side',
+    'qty', 'price', 'stop_loss', 'exit_reason', 'pnl'
+)
+_paper_trade_row = attrgetter(*_PAPER_TRADE_FIELDS)
+
+@dataclass(slots=True)
 class PaperTrade:
     """Paper trade record"""
     trade_id: str
@@ -29,7 +38,7 @@ class PaperTrade:
 class PaperTradingManager:
     """Manage paper trading simulation"""
     
-    def __init__(self):
+    def __init__(self, flush_every: Optional[int] = None):
         self.trades_dir = './trades'
         os.makedirs(self.trades_dir, exist_ok=True)
         
@@ -39,17 +48,29 @@ class PaperTradingManager:
         self.trades: List[PaperTrade] = []
         self.active_trade: Optional[Dict] = None
         
+        # Running P&L aggregates, updated on every exit
+        self._exit_count = 0
+        self._total_pnl = 0
+        self._wins = 0
+        self._losses = 0
+        self._sum_win = 0
+        self._sum_loss = 0
+        
         self._initialize_csv()
+        
+        # One buffered append handle for the whole session instead of open/close per trade;
+        # rows queue in memory and go out in one writerows() batch every `flush_every` rows
+        self.flush_every = settings.PAPER_TRADE_FLUSH_EVERY if flush_every is None else flush_every
+        self._fh = open(self.csv_file, 'a', newline='', buffering=1 << 16)
+        self._writer = csv.writer(self._fh)
+        self._pending_rows: List[tuple] = []
+        atexit.register(self.close)
     
     def _initialize_csv(self):
         """Initialize CSV file with headers"""
         if not os.path.exists(self.csv_file):
             with open(self.csv_file, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=[
-                    'trade_id', 'timestamp', 'action', 'symbol', 'side',
-                    'qty', 'price', 'stop_loss', 'exit_reason', 'pnl'
-                ])
-                writer.writeheader()
+                csv.writer(f).writerow(_PAPER_TRADE_FIELDS)
             logger.info(f"Created paper trading CSV: {self.csv_file}")
     
     def log_entry(
@@ -149,6 +170,16 @@ class PaperTradingManager:
         self.trades.append(trade)
         self._write_to_csv(trade)
         
+        self._exit_count += 1
+        if pnl:
+            self._total_pnl += pnl
+            if pnl > 0:
+                self._wins += 1
+                self._sum_win += pnl
+            else:
+                self._losses += 1
+                self._sum_loss += pnl
+        
         logger.info(f"📝 PAPER EXIT: {self.active_trade['side']} @ {exit_price:.2f} | "
                    f"Reason: {exit_reason} | P&L: ₹{pnl:,.2f}")
         
@@ -168,24 +199,31 @@ class PaperTradingManager:
         return result
     
     def _write_to_csv(self, trade: PaperTrade):
-        """Write trade to CSV file"""
+        """Queue trade row for the CSV file"""
+        self._pending_rows.append(_paper_trade_row(trade))
+        if 0 < self.flush_every <= len(self._pending_rows):
+            self.flush()
+    
+    def flush(self):
+        """Write queued trade rows to the CSV file"""
+        if not self._pending_rows or self._fh.closed:
+            return
         try:
-            with open(self.csv_file, 'a', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=[
-                    'trade_id', 'timestamp', 'action', 'symbol', 'side',
-                    'qty', 'price', 'stop_loss', 'exit_reason', 'pnl'
-                ])
-                writer.writerow(asdict(trade))
+            self._writer.writerows(self._pending_rows)
+            self._fh.flush()
+            self._pending_rows.clear()
         except Exception as e:
             logger.error(f"Error writing to CSV: {e}")
     
+    def close(self):
+        """Flush and close the trade log (registered with atexit)"""
+        self.flush()
+        if not self._fh.closed:
+            self._fh.close()
+    
     def get_daily_pnl(self) -> float:
         """Calculate total P&L for the day"""
-        total_pnl = sum(
-            trade.pnl for trade in self.trades
-            if trade.action == 'EXIT' and trade.pnl is not None
-        )
-        return total_pnl
+        return self._total_pnl
     
     def get_active_trade(self) -> Optional[Dict]:
         """Get current active trade"""
@@ -197,9 +235,11 @@ class PaperTradingManager:
     
     def generate_summary(self) -> Dict:
         """Generate daily trading summary"""
-        exits = [t for t in self.trades if t.action == 'EXIT']
+        self.flush()
+        
+        exit_count = self._exit_count
         
-        if not exits:
+        if not exit_count:
             return {
                 'total_trades': 0,
                 'total_pnl': 0,
@@ -208,18 +248,16 @@ class PaperTradingManager:
                 'win_rate': 0
             }
         
-        total_pnl = sum(t.pnl for t in exits if t.pnl)
-        winning = [t for t in exits if t.pnl and t.pnl > 0]
-        losing = [t for t in exits if t.pnl and t.pnl <= 0]
+        wins, losses = self._wins, self._losses
         
         summary = {
-            'total_trades': len(exits),
-            'total_pnl': total_pnl,
-            'winning_trades': len(winning),
-            'losing_trades': len(losing),
-            'win_rate': (len(winning) / len(exits) * 100) if exits else 0,
-            'avg_win': sum(t.pnl for t in winning) / len(winning) if winning else 0,
-            'avg_loss': sum(t.pnl for t in losing) / len(losing) if losing else 0
+            'total_trades': exit_count,
+            'total_pnl': self._total_pnl,
+            'winning_trades': wins,
+            'losing_trades': losses,
+            'win_rate': wins / exit_count * 100,
+            'avg_win': self._sum_win / wins if wins else 0,
+            'avg_loss': self._sum_loss / losses if losses else 0
         }
         
         return summary
@@ -243,5 +281,7 @@ class PaperTradingManager:
         print("="*60)
         print(f"📁 Trade log saved to: {self.csv_file}\n")
 
-# Global instance
-paper_trading_manager = PaperTradingManager()
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_paper_trading_manager() -> PaperTradingManager:
+    """Global instance, created on first use so importing this module has no disk I/O"""
+    return PaperTradingManager()
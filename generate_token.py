@@ -4,6 +4,7 @@ Generate KiteConnect access token (run this daily)
 from kiteconnect import KiteConnect
 import os
 from dotenv import load_dotenv
+from utils.envfile import set_env
 
 load_dotenv()
 
@@ -68,24 +69,7 @@ def main():
 def update_env_file(access_token):
     """Update .env file with new access token"""
     try:
-        # Read current .env
-        with open('.env', 'r') as f:
-            lines = f.readlines()
-        
-        # Update or add KITE_ACCESS_TOKEN
-        updated = False
-        for i, line in enumerate(lines):
-            if line.startswith('KITE_ACCESS_TOKEN='):
-                lines[i] = f'KITE_ACCESS_TOKEN={access_token}\n'
-                updated = True
-                break
-        
-        if not updated:
-            lines.append(f'\nKITE_ACCESS_TOKEN={access_token}\n')
-        
-        # Write back
-        with open('.env', 'w') as f:
-            f.writelines(lines)
+        set_env('KITE_ACCESS_TOKEN', access_token)
         
         print("✅ .env file updated successfully!\n")
         
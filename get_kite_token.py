@@ -1,19 +1,19 @@
 """
-Simple Flask server to get Kite access token
+Simple local HTTP server to get Kite access token
 Run this script, login via browser, get token, then stop the server
 """
-from flask import Flask, request, redirect
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlsplit, parse_qs
 from kiteconnect import KiteConnect
 import os
 from dotenv import load_dotenv
+from utils.envfile import set_env
 import webbrowser
 import threading
 import time
 
 load_dotenv()
 
-app = Flask(__name__)
-
 # Kite credentials
 API_KEY = os.getenv('KITE_API_KEY')
 API_SECRET = os.getenv('KITE_API_SECRET')
@@ -27,8 +27,8 @@ kite = KiteConnect(api_key=API_KEY)
 # Global variable to store token
 access_token = None
 server_running = True
+httpd = None
 
-@app.route('/')
 def index():
     """Root route - redirect to login"""
     login_url = kite.login_url()
@@ -51,12 +51,11 @@ def index():
     </html>
     '''
 
-@app.route('/callback')
-def callback():
+def callback(query: dict):
     """Callback route - receives request_token from Kite"""
     global access_token, server_running
     
-    request_token = request.args.get('request_token')
+    request_token = query.get('request_token', [None])[0]
     
     if not request_token:
         return '''
@@ -121,24 +120,7 @@ def callback():
 def update_env_file(token):
     """Update .env file with new access token"""
     try:
-        # Read current .env
-        with open('.env', 'r') as f:
-            lines = f.readlines()
-        
-        # Update or add KITE_ACCESS_TOKEN
-        updated = False
-        for i, line in enumerate(lines):
-            if line.startswith('KITE_ACCESS_TOKEN='):
-                lines[i] = f'KITE_ACCESS_TOKEN={token}\n'
-                updated = True
-                break
-        
-        if not updated:
-            lines.append(f'\nKITE_ACCESS_TOKEN={token}\n')
-        
-        # Write back
-        with open('.env', 'w') as f:
-            f.writelines(lines)
+        set_env('KITE_ACCESS_TOKEN', token)
         
         print(f"\n✅ Access token saved to .env file")
         print(f"Token: {token}")
@@ -149,7 +131,7 @@ def update_env_file(token):
         print(f"KITE_ACCESS_TOKEN={token}")
 
 def shutdown_server():
-    """Shutdown Flask server"""
+    """Shutdown token server"""
     global server_running
     server_running = False
     print("\n" + "="*80)
@@ -160,13 +142,29 @@ def shutdown_server():
     print("  python main.py")
     print("\n" + "="*80)
     
-    # Shutdown Flask
-    func = request.environ.get('werkzeug.server.shutdown')
-    if func is None:
-        # For production WSGI servers
-        os._exit(0)
-    else:
-        func()
+    # Stop serve_forever() (runs on the Timer thread, not the server thread)
+    httpd.shutdown()
+
+class TokenHandler(BaseHTTPRequestHandler):
+    """Serves the login page and the Kite redirect callback"""
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        
+        if url.path == '/':
+            body = index()
+        elif url.path == '/callback':
+            body = callback(parse_qs(url.query))
+        else:
+            self.send_error(404)
+            return
+        
+        payload = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
 
 def open_browser():
     """Open browser after server starts"""
@@ -190,10 +188,13 @@ if __name__ == '__main__':
     # Open browser in background
     threading.Thread(target=open_browser, daemon=True).start()
     
-    # Run Flask server
+    # Run token server
+    httpd = HTTPServer(('localhost', 5000), TokenHandler)
     try:
-        app.run(host='localhost', port=5000, debug=False)
+        httpd.serve_forever()
     except KeyboardInterrupt:
         print("\n\n🛑 Server stopped by user")
+    finally:
+        httpd.server_close()
     
     print("\n✅ Done!\n")
\ No newline at end of file
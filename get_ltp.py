@@ -11,49 +11,106 @@ import pandas as pd
 from dotenv import load_dotenv
 from kiteconnect import KiteConnect
 
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
 # Load environment variables
 load_dotenv()
 
 # Constants
 NIFTY_TOKEN = 256265  # Nifty 50 spot token
 INSTRUMENTS_CSV = './data/instruments.csv'
+INSTRUMENTS_PARQUET = './data/instruments.parquet'  # parsed, sliced copy, reused while newer than the CSV
+
+# EQ/INDEX = Equity/Index on NSE, CE/PE = Options on NFO
+EXCHANGE_BY_TYPE = {'EQ': 'NSE', 'INDEX': 'NSE', 'CE': 'NFO', 'PE': 'NFO'}
+
+
+def build_instrument_keys(instruments_df: pd.DataFrame) -> dict:
+    """
+    Map each instrument token to its Kite key (e.g., 'NSE:NIFTY 50' or 'NFO:NIFTY25O0725000CE')
+    
+    Args:
+        instruments_df: DataFrame with instruments data
+        
+    Returns:
+        Dictionary of token -> 'EXCHANGE:symbol'
+    """
+    instrument_keys = {}
+    for token, symbol, option_type in zip(
+        instruments_df['token'].tolist(),
+        instruments_df['symbol'].tolist(),
+        instruments_df['option_type'].tolist()
+    ):
+        if token not in instrument_keys:
+            instrument_keys[token] = f"{EXCHANGE_BY_TYPE.get(option_type, 'NFO')}:{symbol}"
+    return instrument_keys
 
 
-def get_exchange_for_token(token: int, instruments_df: pd.DataFrame) -> str:
+def get_exchange_for_token(token: int, instrument_keys: dict) -> str:
     """
     Determine exchange (NSE/NFO) for a given token
     
     Args:
         token: Instrument token
-        instruments_df: DataFrame with instruments data
+        instrument_keys: Mapping built by build_instrument_keys()
         
     Returns:
         'NSE' for equity/index, 'NFO' for options
     """
-    try:
-        instrument = instruments_df[instruments_df['token'] == token]
-        
-        if not instrument.empty:
-            option_type = instrument.iloc[0]['option_type']
-            # EQ = Equity/Index on NSE, CE/PE = Options on NFO
-            if option_type == 'EQ':
-                return 'NSE'
-            elif option_type in ['CE', 'PE']:
-                return 'NFO'
-        
-        # Default to NFO if not found
-        return 'NFO'
-        
-    except Exception as e:
-        print(f"⚠️  Warning: Could not determine exchange for token {token}: {e}")
+    key = instrument_keys.get(token)
+    
+    # Default to NFO if not found
+    if key is None:
         return 'NFO'
+    
+    return key.split(':', 1)[0]
 
 
 def load_instruments():
-    """Load instruments from CSV"""
+    """Load instruments from CSV (or its Parquet copy when that is up to date)"""
     try:
-        df = pd.read_csv(INSTRUMENTS_CSV)
-        print(f"✅ Loaded {len(df)} instruments from {INSTRUMENTS_CSV}")
+        if (CSV_ENGINE == 'pyarrow' and os.path.exists(INSTRUMENTS_PARQUET)
+                and os.path.getmtime(INSTRUMENTS_PARQUET) > os.path.getmtime(INSTRUMENTS_CSV)):
+            try:
+                df = pd.read_parquet(INSTRUMENTS_PARQUET)
+                print(f"✅ Loaded {len(df)} instruments from {INSTRUMENTS_PARQUET}")
+                return df
+            except Exception as e:
+                print(f"⚠️  Warning: Could not read {INSTRUMENTS_PARQUET}, re-reading CSV: {e}")
+        
+        df = pd.read_csv(
+            INSTRUMENTS_CSV,
+            engine=CSV_ENGINE,
+            # Arrow-backed columns only when pyarrow is there (optional dependency)
+            **({'dtype_backend': 'pyarrow'} if CSV_ENGINE == 'pyarrow' else {}),
+            parse_dates=['expiry'],
+            dtype={
+                'token': 'int64',
+                'strike': 'float64',
+                'lot_size': 'int32',
+                'symbol': 'string',
+                'option_type': 'string'
+            }
+        )
+        loaded = len(df)
+        
+        # Keep only what this script queries: Nifty spot and the two nearest option expiries
+        df = df[df['symbol'].str.startswith('NIFTY') & df['option_type'].isin(['CE', 'PE', 'EQ', 'INDEX'])]
+        is_option = df['option_type'].isin(['CE', 'PE'])
+        near_expiries = df.loc[is_option, 'expiry'].drop_duplicates().sort_values().head(2)
+        df = df[~is_option | df['expiry'].isin(near_expiries)].reset_index(drop=True)
+        print(f"✅ Loaded {loaded} instruments from {INSTRUMENTS_CSV} (kept {len(df)} nearest-expiry rows)")
+        
+        if CSV_ENGINE == 'pyarrow':
+            try:
+                df.to_parquet(INSTRUMENTS_PARQUET, engine='pyarrow', compression='zstd')
+            except Exception as e:
+                print(f"⚠️  Warning: Could not write {INSTRUMENTS_PARQUET}: {e}")
+        
         return df
     except FileNotFoundError:
         print(f"❌ Error: Instruments CSV not found at {INSTRUMENTS_CSV}")
@@ -63,87 +120,72 @@ def load_instruments():
         sys.exit(1)
 
 
-def find_strike_token(instruments_df: pd.DataFrame, strike: float, option_type: str) -> dict:
+def build_strike_index(instruments_df: pd.DataFrame) -> dict:
     """
-    Find token for given strike and option type
+    Index the nearest weekly expiry's options by (strike, option_type)
     
     Args:
-        instruments_df: DataFrame with instruments data
-        strike: Strike price (e.g., 25000)
-        option_type: 'CE' or 'PE'
+        instruments_df: DataFrame with instruments data (expiry already parsed)
         
     Returns:
-        Dictionary with token, symbol, and other details
+        Dictionary of (strike, option_type) -> strike details
     """
-    # Get nearest weekly expiry
-    instruments_df['expiry'] = pd.to_datetime(instruments_df['expiry'])
-    expiries = sorted(instruments_df['expiry'].unique())
-    nearest_expiry = expiries[0] if expiries else None
+    is_option = instruments_df['option_type'].isin(['CE', 'PE'])
+    if not is_option.any():
+        return {}
     
-    # Filter for matching strike and option type
-    mask = (
-        (instruments_df['strike'] == strike) &
-        (instruments_df['option_type'] == option_type) &
-        (instruments_df['expiry'] == nearest_expiry)
-    )
+    # Get nearest weekly expiry (single reduction over the option rows' expiry column)
+    expiry = instruments_df['expiry']
+    nearest_expiry = expiry[is_option].min()
+    near = instruments_df[is_option & (expiry == nearest_expiry)]
     
-    result = instruments_df[mask]
+    strike_index = {}
+    for row in near.itertuples(index=False):
+        strike_index.setdefault((row.strike, row.option_type), {
+            'token': int(row.token),
+            'symbol': row.symbol,
+            'strike': row.strike,
+            'option_type': row.option_type,
+            'expiry': row.expiry,
+            'lot_size': int(row.lot_size)
+        })
     
-    if result.empty:
-        return None
+    return strike_index
+
+
+def find_strike_token(strike_index: dict, strike: float, option_type: str) -> dict:
+    """
+    Find token for given strike and option type
     
-    row = result.iloc[0]
-    return {
-        'token': int(row['token']),
-        'symbol': row['symbol'],
-        'strike': row['strike'],
-        'option_type': row['option_type'],
-        'expiry': row['expiry'],
-        'lot_size': int(row['lot_size'])
-    }
+    Args:
+        strike_index: Index built by build_strike_index()
+        strike: Strike price (e.g., 25000)
+        option_type: 'CE' or 'PE'
+        
+    Returns:
+        Dictionary with token, symbol, and other details
+    """
+    return strike_index.get((strike, option_type))
 
 
-def get_ltp(kite: KiteConnect, tokens: list, instruments_df: pd.DataFrame) -> dict:
+def get_ltp(kite: KiteConnect, tokens: list, instrument_keys: dict) -> dict:
     """
     Fetch LTP for given tokens
     
     Args:
         kite: KiteConnect instance
         tokens: List of instrument tokens
-        instruments_df: DataFrame with instruments data
+        instrument_keys: Mapping built by build_instrument_keys()
         
     Returns:
         Dictionary with token -> LTP mapping
     """
     try:
-        # Build instrument keys with correct exchange prefix and trading symbol
-        instrument_keys = []
-        token_to_key = {}
-        
-        for token in tokens:
-            # Find the instrument in the dataframe
-            instrument = instruments_df[instruments_df['token'] == token]
-            
-            if not instrument.empty:
-                row = instrument.iloc[0]
-                symbol = row['symbol']
-                option_type = row['option_type']
-                
-                # Determine exchange based on option type
-                if option_type == 'EQ' or option_type == 'INDEX':
-                    exchange = 'NSE'
-                elif option_type in ['CE', 'PE']:
-                    exchange = 'NFO'
-                else:
-                    exchange = 'NFO'
-                
-                # Create trading symbol key (e.g., 'NSE:NIFTY 50' or 'NFO:NIFTY25O0725000CE')
-                key = f"{exchange}:{symbol}"
-                instrument_keys.append(key)
-                token_to_key[token] = key
+        # Resolve prebuilt instrument keys; unknown tokens are skipped
+        token_to_key = {token: instrument_keys[token] for token in tokens if token in instrument_keys}
         
         # Fetch LTP
-        ltp_data = kite.ltp(instrument_keys)
+        ltp_data = kite.ltp(list(token_to_key.values()))
         
         # Extract LTP values
         result = {}
@@ -225,7 +267,8 @@ Examples:
     
     # Add strike if provided
     if args.strike and args.type:
-        strike_data = find_strike_token(instruments_df, args.strike, args.type)
+        strike_index = build_strike_index(instruments_df)
+        strike_data = find_strike_token(strike_index, args.strike, args.type)
         
         if strike_data:
             tokens_to_fetch.append(strike_data['token'])
@@ -245,7 +288,7 @@ Examples:
     print("📈 Fetching LTP...")
     print("-"*60)
     
-    ltp_data = get_ltp(kite, tokens_to_fetch, instruments_df)
+    ltp_data = get_ltp(kite, tokens_to_fetch, build_instrument_keys(instruments_df))
     
     # Display results
     if ltp_data:
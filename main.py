@@ -1,16 +1,18 @@
 """
 Main trading bot - Live/Paper trading with WebSocket
 """
-import time
 import signal
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
 from datetime import datetime, time as dt_time
 from typing import Optional, Dict
 import pandas as pd
 
 from config.settings import settings
 from utils.logger import setup_logger, get_logger
-from utils.helpers import get_current_time, is_market_open, is_between_times, generate_trade_id
+from utils.helpers import get_current_time, is_market_open, generate_trade_id
 from utils.candle_aggregator import candle_aggregator
 from utils.data_storage import data_storage
 from data.broker_api import broker_api
@@ -19,13 +21,30 @@ from strategy.reference_levels import reference_calculator
 from strategy.strike_selector import strike_selector
 from strategy.breakout_logic import breakout_detector
 from strategy.stop_loss import stop_loss_manager
-from strategy.indicators import get_latest_rsi, track_rsi_peak, check_rsi_exit_condition
+from strategy.indicators import get_latest_rsi_from_closes, track_rsi_peak, check_rsi_exit_condition
 from execution.order_manager import order_manager
-from execution.paper_trading import paper_trading_manager
+from execution.paper_trading import get_paper_trading_manager
 
 # Setup logger
 logger = setup_logger('TradingBot', settings.LOG_FILE_PATH, settings.LOG_LEVEL)
 
+# Wall-clock steps of the trading loop
+REFERENCE_CALC_START = dt_time(10, 0)
+REFERENCE_CALC_END = dt_time(10, 1)
+HARD_EXIT_TIME = dt_time(15, 15)
+# Completed 5-min candles are checked for entries from this time
+ENTRY_CHECK_START = dt_time(10, 15)
+
+# (low, mid, high) option reference levels for each side
+SIDE_REF_LEVELS = {
+    'CALL': attrgetter('GC', 'BC', 'RC'),
+    'PUT': attrgetter('GP', 'BP', 'RP'),
+}
+# Longest the trading loop sleeps when no step is due (also the stale-tick sweep cadence)
+IDLE_WAKE_SECONDS = 60
+# Retry cadence while a step is due but its data (candles, prices) is not in yet
+STEP_RETRY_SECONDS = 1
+
 class TradingBot:
     """Main trading bot orchestrator with WebSocket support"""
     
@@ -39,11 +58,19 @@ class TradingBot:
         self.entry_price: Optional[float] = None
         self.rsi_peak: Optional[float] = None
         
+        # Reference levels, cached whenever reference_calculator recomputes them
+        self.levels = None
+        
         # Instrument tokens
         self.nifty_token: Optional[int] = None
         self.call_token: Optional[int] = None
         self.put_token: Optional[int] = None
         
+        # Per-side lookups, filled once at strike selection
+        self._side_token: Dict[str, int] = {}
+        self._side_inst: Dict[str, Dict] = {}
+        self._token_names: Dict[int, str] = {}
+        
         # Daily P&L tracking
         self.daily_pnl = 0.0
         
@@ -58,6 +85,9 @@ class TradingBot:
         self.tick_count = 0
         self.nifty_tick_count = 0
         self.last_tick_log_time = None
+        
+        # Set to wake the trading loop early (shutdown, position opened)
+        self._wakeup = threading.Event()
     
     def start(self):
         """Start the trading bot"""
@@ -93,6 +123,7 @@ class TradingBot:
         
         # Register Nifty instrument name in candle aggregator
         candle_aggregator.register_instrument_name(self.nifty_token, "NIFTY50")
+        self._token_names = {self.nifty_token: "NIFTY50"}
         
         # Subscribe to Nifty from the start
         self._subscribe_nifty()
@@ -118,7 +149,7 @@ class TradingBot:
             
             # Start WebSocket with Nifty token
             broker_api.start_websocket([self.nifty_token], self._on_tick)
-            broker_api.subscribed_tokens = []
+            broker_api.subscribed_tokens.clear()
             broker_api.add_tokens([self.nifty_token])
             
             # Register candle completion callbacks
@@ -193,7 +224,9 @@ class TradingBot:
                 ref_end = settings.TIMEZONE.localize(datetime.combine(current_date, dt_time(10, 0)))
                 
                 # Filter dataframe for reference window
-                ref_df = nifty_df[(nifty_df.index >= ref_start) & (nifty_df.index <= ref_end)]
+                # (time-sorted, so slice by binary search rather than two boolean masks)
+                nifty_index = nifty_df.index
+                ref_df = nifty_df.iloc[nifty_index.searchsorted(ref_start, side='left'):nifty_index.searchsorted(ref_end, side='right')]
                 
                 if not ref_df.empty:
                     logger.info(f"📊 Using {len(ref_df)} candles from 9:45-10:00 for reference levels")
@@ -204,6 +237,7 @@ class TradingBot:
                         call_df=ref_df.copy(),  # Temporary - will recalculate
                         put_df=ref_df.copy()    # Temporary - will recalculate
                     )
+                    self.levels = reference_calculator.get_levels()
                     
                     self.reference_levels_set = True
                     logger.info("✅ Reference levels calculated from historical data")
@@ -217,10 +251,18 @@ class TradingBot:
             logger.error(f"Error fetching historical data on start: {e}", exc_info=True)
     
     def _on_tick(self, ticks):
-        """Handle incoming WebSocket ticks"""
-        if not ticks:
-            logger.debug("⚠️ Received empty ticks list")
-            return
+        """
+        Handle incoming WebSocket ticks: storage, counters/logging, candle aggregation
+        
+        Runs on BrokerAPI's tick consumer thread, which drops empty batches and
+        coalesces messages that queued up while the previous batch was processed.
+        """
+        # BrokerAPI stamps each message's arrival time (epoch ns); build one datetime
+        # per distinct stamp. 'now' is only a last-resort fallback. Valid ticks are
+        # handed to the candle aggregator as one batch
+        now = datetime.now()
+        arrival_times = {}
+        batch_tokens, batch_ltps, batch_timestamps = [], [], []
         
         for tick in ticks:
             try:
@@ -235,7 +277,15 @@ class TradingBot:
                 
                 token = tick['instrument_token']
                 ltp = tick['last_price']
-                timestamp = tick.get('timestamp', datetime.now())
+                timestamp = tick.get('timestamp')
+                if timestamp is None:
+                    arrival_ns = tick.get('arrival_ns')
+                    if arrival_ns is None:
+                        timestamp = now
+                    else:
+                        timestamp = arrival_times.get(arrival_ns)
+                        if timestamp is None:
+                            timestamp = arrival_times[arrival_ns] = datetime.fromtimestamp(arrival_ns / 1e9)
                 
            # Increment tick counters
                 self.tick_count += 1
@@ -258,17 +308,25 @@ class TradingBot:
                 
                 # Periodic logging every 100 Nifty ticks
                 if token == self.nifty_token and self.nifty_tick_count % 100 == 0:
-                    logger.info(f"📊 Nifty Tick Count: {self.nifty_tick_count} | Latest LTP: ₹{ltp:.2f}")
+                    logger.info("📊 Nifty Tick Count: %d | Latest LTP: ₹%.2f", self.nifty_tick_count, ltp)
                 
                 # Save tick to CSV
                 data_storage.save_tick(token, ltp, timestamp, instrument_name)
                 
-                # Add to candle aggregator
-                candle_aggregator.add_tick(token, ltp, timestamp)
+                batch_tokens.append(token)
+                batch_ltps.append(ltp)
+                batch_timestamps.append(timestamp)
                 
             except Exception as e:
                 logger.error(f"❌ Error processing tick: {e}", exc_info=True)
                 logger.error(f"   Tick data: {tick}")
+        
+        # Add to candle aggregator
+        if batch_tokens:
+            try:
+                candle_aggregator.add_ticks(batch_tokens, batch_ltps, batch_timestamps)
+            except Exception as e:
+                logger.error(f"❌ Error aggregating ticks: {e}", exc_info=True)
     
     def _on_5min_candle_complete(self, token: int, candle: Dict):
         """Callback when 5-min candle completes"""
@@ -284,72 +342,99 @@ class TradingBot:
             logger.info("=" * 80)
             logger.info("📊 NIFTY 50 - 5 MINUTE CANDLE COMPLETED")
             logger.info("=" * 80)
-            logger.info(f"⏰ Current Time:        {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
-            logger.info(f"🕐 Candle Time Window:  {candle_start.strftime('%H:%M:%S')} - {candle_end.strftime('%H:%M:%S')}")
-            logger.info(f"📈 Open:                ₹{candle['open']:.2f}")
-            logger.info(f"📈 High:                ₹{candle['high']:.2f}")
-            logger.info(f"📉 Low:                 ₹{candle['low']:.2f}")
-            logger.info(f"📊 Close:               ₹{candle['close']:.2f}")
+            logger.info("⏰ Current Time:        %s", current_time.strftime('%Y-%m-%d %H:%M:%S'))
+            logger.info("🕐 Candle Time Window:  %s - %s", candle_start.strftime('%H:%M:%S'), candle_end.strftime('%H:%M:%S'))
+            logger.info("📈 Open:                ₹%.2f", candle['open'])
+            logger.info("📈 High:                ₹%.2f", candle['high'])
+            logger.info("📉 Low:                 ₹%.2f", candle['low'])
+            logger.info("📊 Close:               ₹%.2f", candle['close'])
             logger.info("=" * 80)
         else:
             # For other tokens (options), keep simple logging
-            logger.info(f"📊 5-min candle complete for token {token}: {candle}")
+            logger.info("📊 5-min candle complete for token %s: %s", token, candle)
         
         # Check if we need to process this candle for entry/management
         # After strikes are selected, monitor for entry
         if self.strikes_selected and not self.in_position:
-            if current_time.time() >= dt_time(10, 15):
+            if current_time.time() >= ENTRY_CHECK_START:
                 self._check_entry_from_candle(candle)
         
         # If in position, manage it
         if self.in_position:
             self._manage_position_from_candle(candle)
     
+    def _wait(self, seconds: float):
+        """Sleep until timeout or until something calls self._wakeup.set()"""
+        self._wakeup.wait(seconds)
+        self._wakeup.clear()
+    
+    def _seconds_until_next_step(self, current_time: datetime) -> float:
+        """How long the trading loop can sleep before a wall-clock step needs it"""
+        now = current_time.time()
+        
+        # Steps that are due but may need retries until candles/prices arrive
+        if not self.reference_levels_set and REFERENCE_CALC_START <= now <= REFERENCE_CALC_END:
+            return STEP_RETRY_SECONDS
+        if self.reference_levels_set and not self.strikes_selected and now >= REFERENCE_CALC_START:
+            return STEP_RETRY_SECONDS
+        if self.in_position and now >= HARD_EXIT_TIME:
+            return STEP_RETRY_SECONDS
+        
+        # Otherwise sleep until the next step's start time, capped at the idle cadence
+        now_sec = now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1e6
+        wait = IDLE_WAKE_SECONDS
+        for step_time in (REFERENCE_CALC_START, HARD_EXIT_TIME):
+            step_sec = step_time.hour * 3600 + step_time.minute * 60
+            if now_sec < step_sec:
+                wait = min(wait, step_sec - now_sec)
+        return wait
+    
     def _trading_loop(self):
-        """Main trading loop"""
+        """Main trading loop: wakes when a wall-clock step is due instead of every second"""
         while self.running:
             try:
                 current_time = get_current_time()
                 
-                # Check if market is open
-                if not is_market_open():
+                # Check if market is open (same clock read for every step below)
+                if not is_market_open(current_time):
                     logger.info("Market is closed. Waiting...")
-                    time.sleep(60)
+                    self._wait(60)
                     continue
                 
+                now = current_time.time()
+                
                 # Step 1: Calculate reference levels (09:45-10:00)
                 # Only process if not already handled by late start logic
                 if not self.reference_levels_set:
-                    if is_between_times('10:00', '10:01'):
+                    if REFERENCE_CALC_START <= now <= REFERENCE_CALC_END:
                         # Normal flow - use aggregated candles
                         self._calculate_reference_levels_from_candles()
                 
                 # Step 2: Select strikes at 10:00
                 # Only process if not already handled by late start logic
                 if self.reference_levels_set and not self.strikes_selected:
-                    if current_time.time() >= dt_time(10, 0):
+                    if now >= REFERENCE_CALC_START:
                         self._select_strikes()
                 
                 # Hard exit at 3:15 PM
-                if current_time.time() >= dt_time(15, 15) and self.in_position:
+                if now >= HARD_EXIT_TIME and self.in_position:
                     current_price = self._get_current_option_price()
                     if current_price:
                         self._exit_trade(current_price, 'HARD_EXIT')
                 
-                # Check daily loss limit
-                if abs(self.daily_pnl) >= settings.DAILY_LOSS_LIMIT:
-                    logger.warning(f"Daily loss limit reached: ₹{self.daily_pnl:,.2f}. Stopping trading.")
-                    self.running = False
+                # Forget ticks of instruments that stopped streaming (e.g., earlier strikes)
+                broker_api.clear_stale_ticks()
                 
-                # Sleep for 1 second
-                time.sleep(1)
+                # Sleep until the next step is due (daily loss limit is checked in _exit_trade)
+                if self.running:
+                    self._wait(self._seconds_until_next_step(get_current_time()))
                 
             except KeyboardInterrupt:
                 logger.info("Received shutdown signal...")
                 break
             except Exception as e:
                 logger.error(f"Error in trading loop: {e}", exc_info=True)
-                time.sleep(5)
+                self._wait(5)
     
     def _calculate_reference_levels_from_candles(self):
         """Calculate reference levels from aggregated candles (09:45-10:00)"""
@@ -382,6 +467,7 @@ class TradingBot:
                 call_df=nifty_df.copy(),  # Temporary - will recalculate
                 put_df=nifty_df.copy()    # Temporary - will recalculate
             )
+            self.levels = reference_calculator.get_levels()
             
             self.reference_levels_set = True
             logger.info("✅ Reference levels calculated (will refine after strike selection)")
@@ -434,8 +520,20 @@ class TradingBot:
                 logger.error("Failed to select strikes")
                 return
             
+            # A retried selection can land on different strikes; stop ticks for the old ones
+            stale = {self.call_token, self.put_token} - {call_inst['token'], put_inst['token'], None}
+            if stale:
+                broker_api.remove_tokens(stale)
+            
             self.call_token = call_inst['token']
             self.put_token = put_inst['token']
+            self._side_token = {'CALL': self.call_token, 'PUT': self.put_token}
+            self._side_inst = {'CALL': call_inst, 'PUT': put_inst}
+            self._token_names = {
+                self.nifty_token: "NIFTY50",
+                self.call_token: call_inst.get('tradingsymbol', f'CALL_{self.call_token}'),
+                self.put_token: put_inst.get('tradingsymbol', f'PUT_{self.put_token}'),
+            }
             
             logger.info(f"✅ Strikes selected:")
             logger.info(f"   Call: {call_inst['symbol']} (Token: {call_inst['token']})")
@@ -513,21 +611,20 @@ class TradingBot:
             if settings.is_using_real_data():
                 logger.info(f"📥 Fetching historical option data from 09:45 to {fetch_end_time.strftime('%H:%M:%S')}...")
                 
-                # Fetch Call historical data (from 09:45 to current time)
-                call_df = broker_api.get_historical_data(
-                    token=self.call_token,
-                    from_datetime=start_time,
-                    to_datetime=fetch_end_time,
-                    interval='1minute'
-                )
-                
-                # Fetch Put historical data (from 09:45 to current time)
-                put_df = broker_api.get_historical_data(
-                    token=self.put_token,
-                    from_datetime=start_time,
-                    to_datetime=fetch_end_time,
-                    interval='1minute'
-                )
+                # Fetch Call and Put historical data (from 09:45 to current time);
+                # the two REST calls are independent, so run them concurrently
+                with ThreadPoolExecutor(max_workers=2) as ex:
+                    call_future, put_future = (
+                        ex.submit(
+                            broker_api.get_historical_data,
+                            token=token,
+                            from_datetime=start_time,
+                            to_datetime=fetch_end_time,
+                            interval='1minute'
+                        )
+                        for token in (self.call_token, self.put_token)
+                    )
+                    call_df, put_df = call_future.result(), put_future.result()
                 
                 if not call_df.empty and not put_df.empty:
                     # Filter to exact 09:45-10:00 window for reference calculation
@@ -537,8 +634,10 @@ class TradingBot:
                     if put_df.index.tz is None:
                         put_df.index = put_df.index.tz_localize(settings.TIMEZONE)
                     
-                    call_ref = call_df[(call_df.index >= start_time) & (call_df.index <= ref_end_time)]
-                    put_ref = put_df[(put_df.index >= start_time) & (put_df.index <= ref_end_time)]
+                    # Candles come back time-sorted, so slice the window by binary search
+                    call_index, put_index = call_df.index, put_df.index
+                    call_ref = call_df.iloc[call_index.searchsorted(start_time, side='left'):call_index.searchsorted(ref_end_time, side='right')]
+                    put_ref = put_df.iloc[put_index.searchsorted(start_time, side='left'):put_index.searchsorted(ref_end_time, side='right')]
                     
                     # Feed historical option data to candle aggregator for continuity
                     # IMPORTANT: Set trigger_callbacks=False to prevent historical candles from triggering trades
@@ -571,6 +670,7 @@ class TradingBot:
                     
                     # Calculate reference with 09:45-10:00 data only
                     reference_calculator.calculate_from_candle(nifty_df, call_ref, put_ref)
+                    self.levels = reference_calculator.get_levels()
                     logger.info("✅ Reference levels recalculated with historical option data")
                     logger.info(f"   Nifty: {len(nifty_df)} candles, Call: {len(call_ref)} candles, Put: {len(put_ref)} candles")
                 else:
@@ -586,6 +686,7 @@ class TradingBot:
                 
                 if not call_df.empty and not put_df.empty:
                     reference_calculator.calculate_from_candle(nifty_df, call_df, put_df)
+                    self.levels = reference_calculator.get_levels()
                     logger.info("✅ Reference levels recalculated with option data")
                 else:
                     logger.warning("Waiting for option candle data to accumulate...")
@@ -596,7 +697,7 @@ class TradingBot:
     def _check_entry_from_candle(self, candle: Dict):
         """Check for entry signals from completed candle"""
         try:
-            levels = reference_calculator.get_levels()
+            levels = self.levels
             if not levels:
                 return
             
@@ -636,33 +737,32 @@ class TradingBot:
                 # IMPORTANT: Check if candle close is between RN and GN
                 # Only check for entry if price is in the neutral zone
                 if not (levels.GN <= close_price <= levels.RN):
-                    logger.debug(f"Nifty close {close_price:.2f} not between GN ({levels.GN:.2f}) and RN ({levels.RN:.2f}) - skipping entry check")
+                    logger.debug("Nifty close %.2f not between GN (%.2f) and RN (%.2f) - skipping entry check", close_price, levels.GN, levels.RN)
                     return
                 
-                logger.info(f"✅ Nifty close {close_price:.2f} is between GN ({levels.GN:.2f}) and RN ({levels.RN:.2f}) - checking for entry signal")
+                logger.info("✅ Nifty close %.2f is between GN (%.2f) and RN (%.2f) - checking for entry signal", close_price, levels.GN, levels.RN)
                 
-                # Create Nifty candle series with timestamp
-                nifty_series = pd.Series({
+                # Nifty candle with timestamp (plain dict; a pd.Series per candle is pure overhead)
+                nifty_candle = {
                     'timestamp': candle.get('timestamp', datetime.now()),
                     'open': candle['open'],
                     'high': candle['high'],
                     'low': candle['low'],
                     'close': candle['close']
-                })
+                }
                 
                 # Decide side based on two-candle confirmation on Nifty
-                side = breakout_detector.decide_side(nifty_series, levels.RN, levels.GN)
+                side = breakout_detector.decide_side(nifty_candle, levels.RN, levels.GN)
                 
                 if side != 'NONE':
                     # Entry signal confirmed! Get current option price and enter
                     logger.info(f"✅ Entry signal confirmed on Nifty 5-min chart: {side}")
                     
                     # Get the option instrument and current price
-                    call_inst, put_inst = strike_selector.get_instruments()
-                    instrument = call_inst if side == 'CALL' else put_inst
+                    instrument = self._side_inst[side]
                     
                     # Get current option price
-                    option_token = self.call_token if side == 'CALL' else self.put_token
+                    option_token = self._side_token[side]
                     option_price = broker_api.get_ltp(option_token)
                     
                     if option_price:
@@ -676,9 +776,9 @@ class TradingBot:
     def _manage_position_from_candle(self, candle: Dict):
         """Manage position from completed candle"""
         try:
-            current_side_token = self.call_token if self.current_side == 'CALL' else self.put_token
+            token = self._side_token[self.current_side]
             
-            if candle['token'] != current_side_token:
+            if candle['token'] != token:
                 return
             
             current_price = candle['close']
@@ -697,13 +797,10 @@ class TradingBot:
                 return
             
             # Check RSI exit
-            call_inst, put_inst = strike_selector.get_instruments()
-            token = self.call_token if self.current_side == 'CALL' else self.put_token
-            
-            # Get recent candles for RSI
-            recent_df = candle_aggregator.get_candles(token, '5min', count=20)
-            if len(recent_df) >= 15:
-                rsi = get_latest_rsi(recent_df, 'close', 14)
+            # Get recent closes for RSI (plain floats; no DataFrame per candle)
+            recent_closes = candle_aggregator.get_recent_closes(token, count=20)
+            if len(recent_closes) >= 15:
+                rsi = get_latest_rsi_from_closes(recent_closes, 14)
                 if rsi:
                     self.rsi_peak = track_rsi_peak(rsi, self.rsi_peak)
                     if check_rsi_exit_condition(rsi, self.rsi_peak, settings.RSI_EXIT_DROP):
@@ -714,7 +811,7 @@ class TradingBot:
     
     def _get_current_option_price(self) -> Optional[float]:
         """Get current option price"""
-        token = self.call_token if self.current_side == 'CALL' else self.put_token
+        token = self._side_token[self.current_side]
         tick_data = broker_api.get_tick_data(token)
         if tick_data:
             return tick_data['ltp']
@@ -725,9 +822,7 @@ class TradingBot:
         try:
             trade_id = generate_trade_id(side, entry_price)
             
-            ref_low = levels.GC if side == 'CALL' else levels.GP
-            ref_mid = levels.BC if side == 'CALL' else levels.BP
-            ref_high = levels.RC if side == 'CALL' else levels.RP
+            ref_low, ref_mid, ref_high = SIDE_REF_LEVELS[side](levels)
             
             stop_loss_manager.initialize(entry_price, ref_low, ref_mid, ref_high)
             
@@ -742,7 +837,7 @@ class TradingBot:
                 )
             else:
                 logger.info(f"📝 PHASE {settings.TRADING_PHASE}: Simulating order...")
-                response = paper_trading_manager.log_entry(
+                response = get_paper_trading_manager().log_entry(
                     trade_id=trade_id,
                     symbol=instrument['symbol'],
                     side=side,
@@ -757,6 +852,9 @@ class TradingBot:
             self.entry_price = entry_price
             self.rsi_peak = None
             
+            # Let the trading loop reschedule around the hard-exit time
+            self._wakeup.set()
+            
             logger.info(f"✅ ENTERED {side} TRADE: {instrument['symbol']} @ ₹{entry_price:.2f}")
             
         except Exception as e:
@@ -765,8 +863,7 @@ class TradingBot:
     def _exit_trade(self, exit_price: float, exit_reason: str):
         """Exit current trade"""
         try:
-            call_inst, put_inst = strike_selector.get_instruments()
-            instrument = call_inst if self.current_side == 'CALL' else put_inst
+            instrument = self._side_inst[self.current_side]
             
             if settings.is_live_trading():
                 logger.info("🔴 LIVE TRADING: Placing exit order...")
@@ -780,7 +877,7 @@ class TradingBot:
                 )
             else:
                 logger.info(f"📝 PHASE {settings.TRADING_PHASE}: Simulating exit...")
-                response = paper_trading_manager.log_exit(
+                response = get_paper_trading_manager().log_exit(
                     trade_id=self.current_trade_id,
                     exit_price=exit_price,
                     exit_reason=exit_reason
@@ -803,27 +900,25 @@ class TradingBot:
             stop_loss_manager.reset()
             breakout_detector.notify_position_closed()  # Re-arm for next entry
             
+            # Check daily loss limit (daily P&L only changes here; only losses count)
+            if self.daily_pnl <= -settings.DAILY_LOSS_LIMIT:
+                logger.warning(f"Daily loss limit reached: ₹{self.daily_pnl:,.2f}. Stopping trading.")
+                self.running = False
+                self._wakeup.set()
+            
         except Exception as e:
             logger.error(f"Error exiting trade: {e}", exc_info=True)
     
     def _get_instrument_name(self, token: int) -> str:
         """Get instrument name for a token"""
-        if token == self.nifty_token:
-            return "NIFTY50"
-        elif token == self.call_token:
-            call_inst, _ = strike_selector.get_instruments()
-            if call_inst:
-                return call_inst.get('tradingsymbol', f'CALL_{token}')
-        elif token == self.put_token:
-            _, put_inst = strike_selector.get_instruments()
-            if put_inst:
-                return put_inst.get('tradingsymbol', f'PUT_{token}')
-        return f'TOKEN_{token}'
+        name = self._token_names.get(token)
+        return name if name is not None else f'TOKEN_{token}'
     
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals"""
         logger.info(f"\nReceived signal {signum}. Shutting down gracefully...")
         self.running = False
+        self._wakeup.set()
     
     def _shutdown(self):
         """Cleanup and shutdown"""
@@ -835,13 +930,14 @@ class TradingBot:
             if current_price:
                 self._exit_trade(current_price, 'SHUTDOWN')
         
+        # Closes the WebSocket and lets the tick consumer finish what is queued
+        broker_api.disconnect()
+        
         # Close all data storage files
         data_storage.close_all_files()
         
-        broker_api.disconnect()
-        
         if not settings.is_live_trading():
-            paper_trading_manager.print_summary()
+            get_paper_trading_manager().print_summary()
         
         logger.info("✅ Shutdown complete. Goodbye!")
 
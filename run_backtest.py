@@ -16,6 +16,7 @@ def main():
     parser.add_argument('--data', type=str, required=True, help='Path to historical data CSV file')
     parser.add_argument('--start', type=str, help='Start date (YYYY-MM-DD)')
     parser.add_argument('--end', type=str, help='End date (YYYY-MM-DD)')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes for simulating days (default: all CPUs)')
     
     args = parser.parse_args()
     
@@ -42,7 +43,8 @@ def main():
         backtester.run_backtest(
             data_path=args.data,
             start_date=args.start,
-            end_date=args.end
+            end_date=args.end,
+            n_jobs=args.jobs
         )
         
     except FileNotFoundError:
@@ -2,7 +2,7 @@
 Breakout and confirmation detection logic
 (Updated to post-10:00 two-candle confirmation on Nifty 5-minute candles)
 """
-from typing import Optional, Literal
+from typing import Optional, Literal, Mapping, Union
 from dataclasses import dataclass
 from datetime import time
 import pandas as pd
@@ -86,12 +86,12 @@ class BreakoutDetector:
 
     # -------------------- main API (unchanged signature) --------------------
 
-    def decide_side(self, nifty_candle: pd.Series, RN: float, GN: float) -> TradeSide:
+    def decide_side(self, nifty_candle: Union[Mapping, pd.Series], RN: float, GN: float) -> TradeSide:
         """
         Decide trading side based on *Nifty 5-min candles* with two-candle confirmation.
 
         Args:
-            nifty_candle: pd.Series with keys ['timestamp','open','high','low','close']
+            nifty_candle: dict (or pd.Series) with keys ['timestamp','open','high','low','close']
             RN: Resistance level
             GN: (mid/green) level
 
@@ -3,7 +3,7 @@ Technical indicators - RSI calculation
 """
 import pandas as pd
 import numpy as np
-from typing import Optional
+from typing import Optional, Sequence
 
 def calculate_rsi(data: pd.Series, period: int = 14) -> pd.Series:
     """
@@ -46,10 +46,54 @@ def get_latest_rsi(df: pd.DataFrame, price_column: str = 'close', period: int =
     if len(df) < period + 1:
         return None
     
-    rsi_series = calculate_rsi(df[price_column], period)
-    latest_rsi = rsi_series.iloc[-1]
+    rsi_values = calculate_rsi(df[price_column], period).to_numpy(copy=False)
+    latest_rsi = rsi_values[-1]
     
-    return latest_rsi if not pd.isna(latest_rsi) else None
+    return latest_rsi if not np.isnan(latest_rsi) else None
+
+def get_latest_rsi_from_closes(closes: Sequence[float], period: int = 14) -> Optional[float]:
+    """
+    Get latest RSI from a short list of closes without building pandas objects
+    
+    Runs Wilder's recurrence with the same arithmetic as pandas
+    ewm(adjust=False), so the value equals get_latest_rsi() on a DataFrame
+    holding the same closes.
+    
+    Args:
+        closes: Close prices, oldest first
+        period: RSI period
+    
+    Returns:
+        Latest RSI value or None
+    """
+    if len(closes) < period + 1:
+        return None
+    
+    alpha = 1 / period
+    avg_gain = avg_loss = None
+    prev_close = closes[0]
+    
+    for close in closes[1:]:
+        delta = close - prev_close
+        prev_close = close
+        if delta != delta:  # NaN
+            continue
+        gain = max(delta, 0.0)
+        loss = -min(delta, 0.0)
+        
+        if avg_gain is None:
+            avg_gain, avg_loss = gain, loss
+            continue
+        if avg_gain != gain:
+            avg_gain = ((1 - alpha) * avg_gain + alpha * gain) / ((1 - alpha) + alpha)
+        if avg_loss != loss:
+            avg_loss = ((1 - alpha) * avg_loss + alpha * loss) / ((1 - alpha) + alpha)
+    
+    if avg_gain is None:
+        return None
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else None
+    return 100 - (100 / (1 + avg_gain / avg_loss))
 
 def track_rsi_peak(current_rsi: float, peak_rsi: Optional[float]) -> float:
     """
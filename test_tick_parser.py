@@ -0,0 +1,83 @@
+"""
+Test script to verify the bot's binary tick parser against kiteconnect's own
+
+data/broker_api.py replaces KiteTicker._parse_binary with a precompiled
+struct version that skips market depth. This packs LTP, quote, full,
+index-quote and index-full packets (several segments, so every price
+divisor is hit) and checks both parsers return the same fields.
+"""
+import random
+import struct
+
+from kiteconnect import KiteTicker
+
+from data.broker_api import _tuned_kite_ticker
+
+# (segment, name) pairs covering every divisor: cds, bcd/nco and the /100 default
+SEGMENTS = [(1, 'nse'), (2, 'nfo'), (3, 'cds'), (6, 'bcd'), (9, 'indices'), (12, 'nco')]
+
+
+def _packet(length, token, rng, close=None):
+    """Pack one tick packet of the given length with random field values"""
+    values = [token] + [rng.randrange(1, 5_000_000) for _ in range((length - 4) // 4)]
+    if length == 32:
+        values[5] = rng.randrange(0, 10_000)                 # change (ignored by both parsers)
+        values[6] = rng.randrange(1_600_000_000, 1_800_000_000)  # exchange timestamp
+    elif length == 184:
+        values[11] = rng.randrange(1_600_000_000, 1_800_000_000)  # last trade time
+        values[15] = rng.randrange(1_600_000_000, 1_800_000_000)  # exchange timestamp
+    if close is not None:
+        close_index = {28: 5, 32: 4, 44: 10, 184: 10}[length]
+        values[close_index] = close
+    packet = struct.pack(f'>{len(values)}I', *values)
+    if length == 184:
+        # Depth entries are 12 bytes (qty, price, orders + 2 pad), not 16
+        packet = packet[:64] + b''.join(
+            struct.pack('>IIH2x', rng.randrange(1, 10_000), rng.randrange(1, 5_000_000), rng.randrange(1, 100))
+            for _ in range(10)
+        )
+    assert len(packet) == length
+    return packet
+
+
+def _frame(packets):
+    """Wrap packets into one WebSocket binary message"""
+    body = b''.join(struct.pack('>H', len(p)) + p for p in packets)
+    return struct.pack('>H', len(packets)) + body
+
+
+def test_parse_binary_matches_kiteconnect():
+    """Tuned parser returns the same ticks as kiteconnect, minus depth"""
+    print("=" * 80)
+    print("Testing tuned _parse_binary against KiteTicker._parse_binary")
+    print("=" * 80)
+
+    rng = random.Random(42)
+    reference = KiteTicker(api_key='test', access_token='test')
+    tuned = _tuned_kite_ticker()(api_key='test', access_token='test')
+
+    for segment, name in SEGMENTS:
+        token = (rng.randrange(1, 100_000) << 8) | segment
+        lengths = [8, 28, 32] if name == 'indices' else [8, 44, 184]
+        packets = [_packet(length, token, rng) for length in lengths]
+        # close == 0 takes the no-change branch
+        packets += [_packet(length, token, rng, close=0) for length in lengths if length > 8]
+        message = _frame(packets)
+
+        expected = reference._parse_binary(message)
+        actual = tuned._parse_binary(message)
+
+        assert len(actual) == len(expected) == len(packets)
+        for want, got in zip(expected, actual):
+            want.pop('depth', None)
+            assert got == want, f"{name} packet mismatch:\n  kite:  {want}\n  tuned: {got}"
+
+        print(f"✅ {name:8} segment: {len(packets)} packets ({', '.join(map(str, lengths))} bytes) match")
+
+    # Frames shorter than the packet-count header carry no ticks
+    assert tuned._parse_binary(b'') == reference._parse_binary(b'') == []
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    test_parse_binary_matches_kiteconnect()
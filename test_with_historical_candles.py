@@ -21,7 +21,7 @@ from strategy.strike_selector import strike_selector
 from strategy.breakout_logic import breakout_detector
 from strategy.stop_loss import stop_loss_manager
 from strategy.indicators import get_latest_rsi, track_rsi_peak, check_rsi_exit_condition
-from execution.paper_trading import paper_trading_manager
+from execution.paper_trading import get_paper_trading_manager
 from utils.helpers import generate_trade_id
 
 root_logger = setup_logger('', './logs/historical_test.log', 'INFO') 
@@ -198,7 +198,7 @@ class HistoricalTester:
                 logger.info(f"Progress: {progress_pct:.1f}% - {candle_time}")
         
         logger.info("\n✅ Test complete!")
-        paper_trading_manager.print_summary()
+        get_paper_trading_manager().print_summary()
     
     def _calculate_reference_levels(self):
         """Calculate reference from 09:45-10:00"""
@@ -349,7 +349,7 @@ class HistoricalTester:
         
         stop_loss_manager.initialize(entry_price, ref_low, ref_mid, ref_high)
         
-        paper_trading_manager.log_entry(
+        get_paper_trading_manager().log_entry(
             trade_id=trade_id,
             symbol=f"{side}_OPTION",
             side=side,
@@ -399,7 +399,7 @@ class HistoricalTester:
     
     def _exit_trade(self, exit_price, reason):
         """Exit trade"""
-        paper_trading_manager.log_exit(
+        get_paper_trading_manager().log_exit(
             trade_id=self.current_trade_id,
             exit_price=exit_price,
             exit_reason=reason
@@ -1,7 +1,7 @@
 """
 Aggregate real-time ticks into candles
 """
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from collections import defaultdict
 import pandas as pd
@@ -64,6 +64,34 @@ class CandleAggregator:
         # Update 5-minute candle
         self._update_candle(token, ltp, timestamp, interval_minutes=5)
     
+    def add_ticks(self, tokens: List[int], ltps: List[float], timestamps: List[datetime]):
+        """
+        Add a batch of ticks (one WebSocket message) in arrival order
+        
+        Same result as calling add_tick() per tick, but the 1-min/5-min candle
+        times are worked out once per distinct timestamp in the batch rather
+        than twice per tick.
+        
+        Args:
+            tokens: Instrument tokens
+            ltps: Last traded prices
+            timestamps: Tick timestamps
+        """
+        candle_times = {}
+        
+        for token, ltp, timestamp in zip(tokens, ltps, timestamps):
+            times = candle_times.get(timestamp)
+            if times is None:
+                naive = timestamp.replace(tzinfo=None) if timestamp.tzinfo is not None else timestamp
+                minute_start = naive.replace(second=0, microsecond=0)
+                times = candle_times[timestamp] = (
+                    minute_start,
+                    minute_start.replace(minute=(naive.minute // 5) * 5)
+                )
+            
+            self._apply_tick(token, ltp, times[0], interval_minutes=1)
+            self._apply_tick(token, ltp, times[1], interval_minutes=5)
+    
     def add_historical_candle(self, token: int, candle_data: Dict, timestamp: datetime, trigger_callbacks: bool = True):
         """
         Add a complete historical 1-minute candle directly (for historical data loading)
@@ -178,17 +206,7 @@ class CandleAggregator:
     
     def _update_candle(self, token: int, ltp: float, timestamp: datetime, interval_minutes: int):
         """Update candle for given interval"""
-        
-        # Determine which candle dict to use
-        if interval_minutes == 1:
-            current_candles = self.current_1min_candles
-            completed_candles = self.completed_1min_candles
-            callbacks = self.on_1min_candle_callbacks
-        elif interval_minutes == 5:
-            current_candles = self.current_5min_candles
-            completed_candles = self.completed_5min_candles
-            callbacks = self.on_5min_candle_callbacks
-        else:
+        if interval_minutes not in (1, 5):
             return
         
         # Convert to timezone-naive if needed (for consistent comparison)
@@ -202,6 +220,21 @@ class CandleAggregator:
             microsecond=0
         )
         
+        self._apply_tick(token, ltp, candle_time, interval_minutes)
+    
+    def _apply_tick(self, token: int, ltp: float, candle_time: datetime, interval_minutes: int):
+        """Fold one tick into the candle starting at candle_time (already rounded, tz-naive)"""
+        
+        # Determine which candle dict to use
+        if interval_minutes == 1:
+            current_candles = self.current_1min_candles
+            completed_candles = self.completed_1min_candles
+            callbacks = self.on_1min_candle_callbacks
+        else:
+            current_candles = self.current_5min_candles
+            completed_candles = self.completed_5min_candles
+            callbacks = self.on_5min_candle_callbacks
+        
         # Check if we need to start a new candle
         if token not in current_candles:
             # First tick for this token
@@ -309,6 +342,24 @@ class CandleAggregator:
         
         return df
     
+    def get_recent_closes(self, token: int, count: int, interval: str = '5min') -> List[float]:
+        """
+        Closes of the most recent completed candles, oldest first (no DataFrame)
+        
+        Args:
+            token: Instrument token
+            count: Number of recent candles
+            interval: '1min' or '5min'
+        """
+        if interval == '1min':
+            candles = self.completed_1min_candles.get(token, [])
+        elif interval == '5min':
+            candles = self.completed_5min_candles.get(token, [])
+        else:
+            return []
+        
+        return [candle['close'] for candle in candles[-count:]]
+    
     def get_current_candle(self, token: int, interval: str = '5min') -> Optional[Dict]:
         """Get current (incomplete) candle"""
         if interval == '1min':
@@ -0,0 +1,18 @@
+"""
+Helpers for editing the .env file
+"""
+from dotenv import set_key
+
+def set_env(key: str, value: str, path: str = '.env'):
+    """
+    Set KEY=value in an env file, replacing an existing entry or appending one
+
+    Written via python-dotenv's set_key, which rewrites into a temp file and
+    renames it over the original, so an interrupted write can't truncate .env.
+
+    Args:
+        key: Variable name
+        value: New value
+        path: Env file path
+    """
+    set_key(path, key, value, quote_mode='never')
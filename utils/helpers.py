@@ -2,14 +2,19 @@
 Helper utility functions
 """
 from datetime import datetime, time
+from functools import lru_cache
 from typing import Optional
 import pytz
 from config.settings import settings
 
+# pytz zone resolved once in settings; bound here to skip the attribute lookup per call
+_TZ = settings.TIMEZONE
+
 def get_current_time() -> datetime:
     """Get current time in IST"""
-    return datetime.now(settings.TIMEZONE)
+    return datetime.now(_TZ)
 
+@lru_cache(maxsize=None)
 def parse_time_str(time_str: str) -> time:
     """
     Parse time string to time object
@@ -23,9 +28,9 @@ def parse_time_str(time_str: str) -> time:
     hour, minute = map(int, time_str.split(':'))
     return time(hour, minute)
 
-def is_market_open() -> bool:
-    """Check if market is currently open"""
-    current_time = get_current_time().time()
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """Check if market is currently open (at `now` if the caller already read the clock)"""
+    current_time = (now or get_current_time()).time()
     market_start = parse_time_str(settings.MARKET_START_TIME)
     market_end = parse_time_str(settings.MARKET_END_TIME)
     
@@ -79,21 +84,22 @@ def calculate_pnl(entry_price: float, exit_price: float, qty: int, side: str = '
 def format_time(dt: Optional[datetime] = None) -> str:
     """Format datetime to string"""
     if dt is None:
-        dt = get_current_time()
+        return datetime.now(_TZ).strftime('%Y-%m-%d %H:%M:%S')
     return dt.strftime('%Y-%m-%d %H:%M:%S')
 
-def is_between_times(start_time_str: str, end_time_str: str) -> bool:
+def is_between_times(start_time_str: str, end_time_str: str, now: Optional[datetime] = None) -> bool:
     """
     Check if current time is between start and end times
     
     Args:
         start_time_str: Start time as 'HH:MM'
         end_time_str: End time as 'HH:MM'
+        now: Already-read current time (default: read the clock)
     
     Returns:
         True if current time is between start and end
     """
-    current_time = get_current_time().time()
+    current_time = (now or get_current_time()).time()
     start_time = parse_time_str(start_time_str)
     end_time = parse_time_str(end_time_str)
     